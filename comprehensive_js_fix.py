@@ -4,11 +4,14 @@ Comprehensive Wenyan JavaScript Fixer
 Author: Whisky, PR Worker
 
 A comprehensive solution to fix all issues in Wenyan-generated JavaScript
+The command line entry point streams through wenyan_js_stream_fixer
 """
 
 import re
 import sys
 
+from wenyan_js_stream_fixer import PROFILES, fix_file
+
 def format_and_fix_js(js_content):
     """
     Format the JS properly and fix all issues
@@ -102,21 +105,11 @@ def main():
     output_file = sys.argv[2]
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            raw_js = f.read()
-        
-        print(f"Processing {len(raw_js)} characters of JavaScript...")
-        
-        # Fix the JavaScript
-        fixed_statements = format_and_fix_js(raw_js)
-        formatted_js = create_readable_js(fixed_statements)
-        
-        # Write the result
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(formatted_js)
+        stats = fix_file(input_file, output_file, PROFILES['comprehensive'])
         
+        print(f"Processing {stats.characters} characters of JavaScript...")
         print(f"✓ Fixed JavaScript written to {output_file}")
-        print(f"Generated {len(fixed_statements)} statements")
+        print(f"Generated {stats.statements} statements")
         
         return True
         
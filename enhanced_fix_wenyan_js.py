@@ -4,11 +4,14 @@ Enhanced Wenyan JavaScript Post-Processor
 Author: Whisky, PR Worker
 
 Enhanced version that analyzes context to fix console.log calls properly
+The command line entry point streams through wenyan_js_stream_fixer
 """
 
 import sys
 import re
 
+from wenyan_js_stream_fixer import PROFILES, fix_file
+
 def analyze_and_fix_console_logs(js_content):
     """
     Analyze the JavaScript to understand what should be logged
@@ -70,20 +73,10 @@ def main():
     output_file = sys.argv[2]
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            input_js = f.read()
-        
-        print(f"Original JS: {repr(input_js)}")
-        
-        # Apply fixes
-        fixed_js = input_js
-        fixed_js = analyze_and_fix_console_logs(fixed_js)
-        fixed_js = fix_string_literals(fixed_js)
-        
-        print(f"Fixed JS: {repr(fixed_js)}")
+        stats = fix_file(input_file, output_file, PROFILES['enhanced'])
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(fixed_js)
+        print(f"Original JS: {stats.characters} chars, {stats.empty_console_logs} empty console.log() calls")
+        print(f"Fixed JS: {stats.output_characters} chars, {stats.statements} statements")
         
         print(f"✓ Enhanced JavaScript fix applied to {output_file}")
         
@@ -10,12 +10,17 @@ Fixes common issues in JavaScript generated by Wenyan v0.3.4:
 4. Variable scope issues
 
 Usage: python3 fix_wenyan_js.py input.js output.js
+
+The command line entry point streams through wenyan_js_stream_fixer; the
+in-memory functions below are kept for existing callers.
 """
 
 import sys
 import re
 import json
 
+from wenyan_js_stream_fixer import PROFILES, fix_file
+
 def fix_console_log_calls(js_content):
     """
     Fix empty console.log() calls by analyzing the context
@@ -106,17 +111,12 @@ def main():
     output_file = sys.argv[2]
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            input_js = f.read()
-        
-        fixed_js = process_wenyan_javascript(input_js)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(fixed_js)
+        print(f"Processing JavaScript generated by Wenyan...")
+        stats = fix_file(input_file, output_file, PROFILES['basic'])
         
         print(f"✓ JavaScript fixed and saved to {output_file}")
-        print(f"Original size: {len(input_js)} chars")
-        print(f"Fixed size: {len(fixed_js)} chars")
+        print(f"Original size: {stats.characters} chars")
+        print(f"Fixed size: {stats.output_characters} chars")
         
     except Exception as e:
         print(f"Error processing file: {e}")
@@ -33,6 +33,40 @@ if ! command -v python3 &> /dev/null; then
     exit 1
 fi
 
+# 啟動常駐JavaScript修復服務，整個測試過程只啟動一次Python
+coproc FIXER { python3 wenyan_js_fixer_service.py --profile comprehensive 2>/dev/null; }
+
+# 函數：關閉修復服務
+stop_fixer() {
+    if [ -n "${FIXER_PID:-}" ]; then
+        eval "exec ${FIXER[1]}>&-"
+        wait "$FIXER_PID" 2>/dev/null
+    fi
+}
+
+# 函數：將字符串轉為JSON字符串字面量（轉義反斜線、雙引號與控制字符）
+# 在shell內完成，免得每個測試再啟動一次Python
+json_string() {
+    local text="$1"
+    text="${text//\\/\\\\}"
+    text="${text//\"/\\\"}"
+    text="${text//$'\n'/\\n}"
+    text="${text//$'\r'/\\r}"
+    text="${text//$'\t'/\\t}"
+    printf '"%s"' "$text"
+}
+
+# 函數：通過修復服務修復JavaScript
+fix_js_with_service() {
+    local input_js="$1"
+    local output_js="$2"
+    local reply=""
+    
+    printf '{"path": %s, "output": %s}\n' "$(json_string "$input_js")" "$(json_string "$output_js")" >&"${FIXER[1]}" || return 1
+    read -r reply <&"${FIXER[0]}" || return 1
+    [[ "$reply" == *'"ok": true'* ]]
+}
+
 echo "使用 wenyan 版本: $(wenyan --version)" | tee -a "$LOG_FILE"
 echo "開始運行修復版測試..." | tee -a "$LOG_FILE"
 echo "" | tee -a "$LOG_FILE"
@@ -62,7 +96,7 @@ run_fixed_test() {
     fi
     
     # 步驟2：修復JavaScript
-    if python3 comprehensive_js_fix.py "$raw_js" "$fixed_js" 2>/dev/null; then
+    if fix_js_with_service "$raw_js" "$fixed_js"; then
         echo "✓ JavaScript修復成功" | tee -a "$LOG_FILE"
     else
         echo "✗ JavaScript修復失敗" | tee -a "$LOG_FILE"
@@ -114,6 +148,8 @@ for test_file in *.wy; do
     fi
 done
 
+stop_fixer
+
 # 生成最終報告
 echo "==========================================" | tee -a "$LOG_FILE"
 echo "修復版測試結果摘要" | tee -a "$LOG_FILE"
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Wenyan JavaScript Post-Processor Benchmark
+Author: Whisky, PR Worker
+
+Measures throughput, peak memory and scaling of every fixer entry point on
+synthetic Wenyan-style JavaScript (var redeclarations, dense empty
+console.log() calls, long string literals) from 1 KB up to 100 MB.
+
+Each (entry point, size) pair runs in a fresh process so peak RSS is not
+polluted by earlier runs. The scaling exponent is the least-squares slope of
+log(time) against log(size): ~1.0 is linear, ~2.0 means a change has made the
+tool quadratic.
+
+Results can be saved as a JSON baseline; a later run compared against it
+fails when throughput drops by more than --max-regression percent.
+
+Usage: python3 js_fixer_benchmark.py [--max-size 10MB] [--save-baseline FILE] [--compare FILE]
+"""
+
+import io
+import sys
+import json
+import math
+import time
+import random
+import resource
+import argparse
+import contextlib
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_BASELINE = 'performance_js_fixers_baseline.json'
+DEFAULT_SIZES = ['1KB', '10KB', '100KB', '1MB', '10MB']
+ALL_SIZES = DEFAULT_SIZES + ['100MB']
+SIZE_UNITS = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+
+# Runs shorter than this are too noisy to take part in the exponent fit
+MIN_FIT_SECONDS = 0.005
+
+
+def parse_size(text: str) -> int:
+    """
+    '10KB' -> 10240; plain numbers are bytes
+    """
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def generate_wenyan_js(size_bytes: int, seed: int = 42) -> str:
+    """
+    Build roughly size_bytes (UTF-8) of JavaScript shaped like Wenyan output
+    """
+    rng = random.Random(seed)
+    names = [f'變量{i}' for i in range(64)]
+    long_text = '天地玄黃宇宙洪荒日月盈昃辰宿列張' * 8
+    parts: List[str] = []
+    total = 0
+    counter = 0
+
+    while total < size_bytes:
+        counter += 1
+        name = rng.choice(names)
+        choice = rng.random()
+        if choice < 0.25:
+            statement = f'var {name} = {counter}'
+        elif choice < 0.45:
+            statement = 'console.log()'
+        elif choice < 0.60:
+            statement = f'var {name} = "{long_text[:rng.randint(16, len(long_text))]}{counter}"'
+        elif choice < 0.75:
+            statement = f'{name} = {name} + {counter % 97}'
+        elif choice < 0.85:
+            statement = f'const _ans{counter} = {name} * 2'
+        elif choice < 0.95:
+            statement = f'var 術{counter % 16} = function(甲) {{ return 甲 + {counter % 13} }}'
+        else:
+            statement = 'console.log("測試完成")'
+        statement += ';'
+        parts.append(statement)
+        total += len(statement.encode('utf-8'))
+
+    return ''.join(parts)
+
+
+def _quiet(function: Callable[[str], object]) -> Callable[[str], object]:
+    # Legacy fixers print progress; keep it out of the benchmark output
+    def run(js_content: str):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(js_content)
+    return run
+
+
+def entry_points() -> Dict[str, Callable[[str], object]]:
+    """
+    Every fixer entry point, keyed by 'module.function'
+    """
+    from fix_wenyan_js import process_wenyan_javascript
+    from enhanced_fix_wenyan_js import analyze_and_fix_console_logs
+    from comprehensive_js_fix import format_and_fix_js
+    from wenyan_js_output_fixer import fix_console_log_calls
+    from wenyan_js_stream_fixer import fix_text
+
+    return {
+        'fix_wenyan_js.process_wenyan_javascript': _quiet(process_wenyan_javascript),
+        'enhanced_fix_wenyan_js.analyze_and_fix_console_logs': analyze_and_fix_console_logs,
+        'comprehensive_js_fix.format_and_fix_js': format_and_fix_js,
+        'wenyan_js_output_fixer.fix_console_log_calls': fix_console_log_calls,
+        'wenyan_js_stream_fixer.fix_text': fix_text,
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(entry_name: str, size_bytes: int, repeats: int, queue):
+    try:
+        js_content = generate_wenyan_js(size_bytes)
+        function = entry_points()[entry_name]
+        # Warm up regex caches and imports before timing
+        function(generate_wenyan_js(1 << 10))
+        rss_before = _peak_rss_mb()
+        best = math.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function(js_content)
+            best = min(best, time.perf_counter() - start)
+        queue.put({'seconds': best, 'peakRssMB': _peak_rss_mb(), 'rssGrowthMB': _peak_rss_mb() - rss_before})
+    except Exception as e:
+        queue.put({'error': str(e)})
+
+
+def measure(entry_name: str, size_bytes: int, repeats: int, timeout: Optional[float]) -> Dict:
+    """
+    Run one entry point on one input size in a fresh process
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(entry_name, size_bytes, repeats, queue))
+    process.start()
+    try:
+        result = queue.get(timeout=timeout)
+    except Exception:
+        process.kill()
+        result = {'error': 'timeout'}
+    process.join()
+    if 'seconds' in result:
+        result['mbPerSecond'] = (size_bytes / (1 << 20)) / result['seconds'] if result['seconds'] > 0 else math.inf
+    return result
+
+
+def scaling_exponent(points: List[Dict]) -> Optional[float]:
+    """
+    Least-squares slope of log(seconds) over log(bytes)
+    """
+    usable = [(math.log(p['bytes']), math.log(p['seconds']))
+              for p in points if p.get('seconds', 0) >= MIN_FIT_SECONDS]
+    if len(usable) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    spread = sum((x - mean_x) ** 2 for x, _ in usable)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / spread
+
+
+def run_benchmarks(entries: List[str], sizes: List[str], repeats: int, time_budget: float,
+                   timeout: Optional[float]) -> Dict:
+    results = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'entryPoints': {}}
+
+    for entry_name in entries:
+        print(f"▶ {entry_name}")
+        points = []
+        for size_text in sizes:
+            size_bytes = parse_size(size_text)
+            result = measure(entry_name, size_bytes, repeats, timeout)
+            result.update({'size': size_text, 'bytes': size_bytes})
+            points.append(result)
+            if 'error' in result:
+                print(f"  {size_text:>6}: ✗ {result['error']}")
+                break
+            print(f"  {size_text:>6}: {result['seconds'] * 1000:10.2f} ms  "
+                  f"{result['mbPerSecond']:8.2f} MB/s  peak RSS {result['peakRssMB']:8.1f} MB")
+            # Larger inputs would only take longer; stop once the budget is spent
+            if result['seconds'] > time_budget:
+                print(f"  (stopping: {result['seconds']:.1f}s exceeds the {time_budget:.0f}s budget)")
+                break
+
+        exponent = scaling_exponent(points)
+        results['entryPoints'][entry_name] = {'points': points, 'scalingExponent': exponent}
+        if exponent is not None:
+            print(f"  scaling exponent: {exponent:.2f}")
+
+    return results
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, max_regression: float,
+                          max_exponent: Optional[float]) -> List[str]:
+    """
+    Return one message per throughput regression or super-linear entry point
+    """
+    failures = []
+    for entry_name, current in results['entryPoints'].items():
+        previous = baseline.get('entryPoints', {}).get(entry_name)
+        if previous:
+            previous_points = {p['size']: p for p in previous['points'] if 'mbPerSecond' in p}
+            for point in current['points']:
+                before = previous_points.get(point['size'])
+                if not before or 'mbPerSecond' not in point:
+                    continue
+                if point['seconds'] < MIN_FIT_SECONDS and before['seconds'] < MIN_FIT_SECONDS:
+                    continue
+                drop = (before['mbPerSecond'] - point['mbPerSecond']) / before['mbPerSecond'] * 100
+                if drop > max_regression:
+                    failures.append(f"{entry_name} @ {point['size']}: throughput down {drop:.1f}% "
+                                    f"({before['mbPerSecond']:.2f} -> {point['mbPerSecond']:.2f} MB/s)")
+        exponent = current.get('scalingExponent')
+        if max_exponent is not None and exponent is not None and exponent > max_exponent:
+            failures.append(f"{entry_name}: scaling exponent {exponent:.2f} exceeds {max_exponent:.2f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Wenyan JavaScript post-processors')
+    parser.add_argument('--sizes', nargs='+', default=None, help=f'Input sizes (default: {" ".join(DEFAULT_SIZES)})')
+    parser.add_argument('--max-size', default=None, help='Drop sizes above this, e.g. 1MB; use 100MB for the full range')
+    parser.add_argument('--entry', action='append', help='Only benchmark these entry points (repeatable)')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per measurement; the fastest is kept')
+    parser.add_argument('--time-budget', type=float, default=30.0,
+                        help='Skip larger sizes for an entry point once one run takes longer (seconds)')
+    parser.add_argument('--timeout', type=float, default=600.0, help='Abort a single measurement after this many seconds')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, help='Write results as the new baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='Compare against a saved baseline')
+    parser.add_argument('--max-regression', type=float, default=20.0, help='Allowed throughput drop in percent')
+    parser.add_argument('--max-exponent', type=float, default=None, help='Fail when a scaling exponent exceeds this')
+    parser.add_argument('--output', '-o', help='Write this run\'s results to a JSON file')
+
+    args = parser.parse_args()
+
+    sizes = args.sizes or (ALL_SIZES if args.max_size else DEFAULT_SIZES)
+    if args.max_size:
+        limit = parse_size(args.max_size)
+        sizes = [s for s in sizes if parse_size(s) <= limit]
+    entries = args.entry or list(entry_points())
+
+    results = run_benchmarks(entries, sizes, args.repeats, args.time_budget, args.timeout)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    success = True
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = compare_with_baseline(results, baseline, args.max_regression, args.max_exponent)
+        for failure in failures:
+            print(f"✗ {failure}")
+        if failures:
+            success = False
+        else:
+            print(f"✓ No regression beyond {args.max_regression:.0f}% against {args.compare}")
+    elif args.max_exponent is not None:
+        failures = compare_with_baseline(results, {}, args.max_regression, args.max_exponent)
+        for failure in failures:
+            print(f"✗ {failure}")
+        success = not failures
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ Baseline saved to {args.save_baseline}")
+
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
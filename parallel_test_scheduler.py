@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Parallel Wenyan Test Scheduler
+Author: Whisky, PR Worker
+
+Runs test files concurrently for 增強測試運行器.sh. Tests are read from stdin
+as "file<TAB>library" lines and started longest-first, using the per-test
+durations recorded in earlier test_results_*.json reports, so the slowest
+tests never end up as the tail of the run. Tests without history are treated
+as the slowest known test and start early.
+
+Each test's stdout and stderr are captured to <results-dir>/<n>.out and
+<n>.err. When every test has finished, <results-dir>/results.tsv lists
+"n<TAB>file<TAB>library<TAB>exit code<TAB>duration ms" in input order so the
+runner can build its reports exactly as in sequential mode.
+
+With --artifacts the tests are not compiled again: each test's JavaScript
+from the artifact store (wenyan_artifact_store.py) runs in a warm Node worker
+(wenyan_node_pool.py), or in a fresh node process with --cold, and a test
+whose compilation failed is reported from its recorded error.
+
+With --events each finished test is also appended, as it completes, to a
+JSON-lines event log (wenyan_test_reports.py renders the reports from it),
+and with --detailed-log its captured output is appended to that log.
+
+Usage: python3 parallel_test_scheduler.py --results-dir DIR [--jobs N] < tests.tsv
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from wenyan_test_reports import DEFAULT_CATEGORY_CACHE, CategoryCache, make_event, write_event
+
+DEFAULT_HISTORY_PATTERN = 'test_results_*.json'
+DEFAULT_TIMEOUT = 30
+TIMEOUT_EXIT_CODE = 124
+COMPILE_FAILED_EXIT_CODE = 1
+STATUS_MARKS = {'passed': '✓', 'skipped': '○', 'failed': '✗'}
+
+
+def load_history(pattern: str = DEFAULT_HISTORY_PATTERN) -> Dict[str, int]:
+    """
+    Most recent recorded duration (ms) of every test file
+    """
+    durations: Dict[str, int] = {}
+    # Report names embed a sortable timestamp; newer reports win
+    for report_path in sorted(glob.glob(pattern)):
+        try:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for test in report.get('testReport', {}).get('tests', []):
+            if 'file' in test and isinstance(test.get('duration'), (int, float)):
+                durations[test['file']] = int(test['duration'])
+    return durations
+
+
+def order_longest_first(tests: List[Tuple[str, str]], history: Dict[str, int]) -> List[int]:
+    """
+    Indices of tests sorted by expected duration, slowest first
+    """
+    unknown = max(history.values(), default=0) + 1
+    return sorted(range(len(tests)), key=lambda i: history.get(tests[i][0], unknown), reverse=True)
+
+
+def artifact_command(artifacts: str, test_file: str) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    (node command, None) for a compiled test, (None, error file) for a failed one
+    """
+    compiled = os.path.join(artifacts, os.path.normpath(test_file) + '.js')
+    error_path = os.path.join(artifacts, os.path.normpath(test_file) + '.err')
+    if os.path.isfile(error_path):
+        return None, error_path
+    if os.path.isfile(compiled):
+        return ['node', compiled], None
+    return None, None
+
+
+def run_test(command: List[str], out_path: str, err_path: str, timeout: float) -> Tuple[int, int]:
+    """
+    Run one test command with its output captured to files; returns (exit code, ms)
+    """
+    start = time.monotonic()
+    with open(out_path, 'wb') as out, open(err_path, 'wb') as err:
+        try:
+            completed = subprocess.run(command, stdout=out, stderr=err,
+                                       stdin=subprocess.DEVNULL, timeout=timeout)
+            exit_code = completed.returncode
+        except subprocess.TimeoutExpired:
+            exit_code = TIMEOUT_EXIT_CODE
+        except OSError as e:
+            err.write(f"{e}\n".encode('utf-8'))
+            exit_code = 127
+    return exit_code, int((time.monotonic() - start) * 1000)
+
+
+def append_detailed_log(log: TextIO, event: Dict, out_path: str, err_path: str):
+    """
+    The same per-test section the runner has always written to detailed_test_*.log
+    """
+    log.write("==========================================\n")
+    log.write(f"測試文件: {event['file']}\n庫名稱: {event['library']}\n測試類型: {event['category']}\n")
+    for title, path in (("測試輸出 Test Output:", out_path), ("錯誤輸出 Error Output:", err_path)):
+        log.write(title + "\n")
+        log.flush()
+        with open(path, 'r', encoding='utf-8', errors='replace') as captured:
+            shutil.copyfileobj(captured, log)
+        log.write("\n\n")
+    log.write(f"執行時間 Duration: {event['durationMs']}ms\n退出代碼 Exit Code: {event['exitCode']}\n")
+    log.write("==========================================\n")
+    log.flush()
+
+
+def schedule(tests: List[Tuple[str, str]], results_dir: str, jobs: Optional[int] = None,
+             timeout: float = DEFAULT_TIMEOUT, command: Optional[List[str]] = None,
+             history: Optional[Dict[str, int]] = None, quiet: bool = False,
+             artifacts: Optional[str] = None, node_pool=None, events: Optional[TextIO] = None,
+             detailed_log: Optional[TextIO] = None, categories: Optional[CategoryCache] = None,
+             threshold_ms: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Run all tests on a worker pool; returns (exit code, ms) per test in input order
+    """
+    command = command or ['wenyan']
+    history = history if history is not None else {}
+    workers = max(1, jobs or os.cpu_count() or 1)
+    results: List[Optional[Tuple[int, int]]] = [None] * len(tests)
+    finished = [0]
+    lock = threading.Lock()
+
+    def execute(index: int):
+        test_file, _ = tests[index]
+        out_path = os.path.join(results_dir, f'{index}.out')
+        err_path = os.path.join(results_dir, f'{index}.err')
+        command_line, error_path = artifact_command(artifacts, test_file) if artifacts else (None, None)
+        if error_path:
+            open(out_path, 'wb').close()
+            shutil.copyfile(error_path, err_path)
+            results[index] = (COMPILE_FAILED_EXIT_CODE, 0)
+        elif command_line and node_pool is not None:
+            start = time.monotonic()
+            result = node_pool.run(command_line[-1], timeout)
+            with open(out_path, 'w', encoding='utf-8') as out, open(err_path, 'w', encoding='utf-8') as err:
+                out.write(result['stdout'])
+                err.write(result['stderr'])
+            results[index] = (result['exitCode'], int((time.monotonic() - start) * 1000))
+        else:
+            results[index] = run_test(command_line or command + [test_file], out_path, err_path, timeout)
+        exit_code, duration = results[index]
+        event = None
+        if events is not None or detailed_log is not None:
+            category = categories.classify(test_file) if categories is not None else 'unit'
+            event = make_event(test_file, tests[index][1], exit_code, duration, out_path, category)
+        with lock:
+            finished[0] += 1
+            if events is not None:
+                write_event(events, event)
+            if detailed_log is not None:
+                append_detailed_log(detailed_log, event, out_path, err_path)
+            if not quiet:
+                mark = STATUS_MARKS[event['status']] if event else ('✓' if exit_code == 0 else '✗')
+                slow = ' ⚠️' if threshold_ms is not None and duration > threshold_ms else ''
+                print(f"[{finished[0]}/{len(tests)}] {mark} {test_file} ({duration}ms){slow}", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(execute, order_longest_first(tests, history)))
+
+    with open(os.path.join(results_dir, 'results.tsv'), 'w', encoding='utf-8') as f:
+        for index, ((test_file, lib_name), (exit_code, duration)) in enumerate(zip(tests, results)):
+            f.write(f"{index}\t{test_file}\t{lib_name}\t{exit_code}\t{duration}\n")
+
+    return results
+
+
+def read_tests(source) -> List[Tuple[str, str]]:
+    tests = []
+    for line in source:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        test_file, _, lib_name = line.partition('\t')
+        tests.append((test_file, lib_name))
+    return tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Wenyan test files in parallel, slowest first')
+    parser.add_argument('--results-dir', '-d', required=True, help='Directory for captured output and results.tsv')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Concurrent tests (default: CPU count)')
+    parser.add_argument('--timeout', '-t', type=float, default=DEFAULT_TIMEOUT, help='Per-test timeout in seconds')
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATTERN, help='Glob of earlier JSON reports')
+    parser.add_argument('--command', default='wenyan', help='Command used to run one test file')
+    parser.add_argument('--artifacts', help='Run compiled tests from this artifact store with node')
+    parser.add_argument('--cold', action='store_true', help='Start a fresh node per test instead of warm workers')
+    parser.add_argument('--max-tests-per-worker', type=int, default=None, help='Recycle warm workers after N tests')
+    parser.add_argument('--max-worker-memory', type=int, default=None, help='Recycle warm workers above this RSS (MB)')
+    parser.add_argument('--events', help='Append one JSON-lines event per finished test to this file')
+    parser.add_argument('--detailed-log', help='Append each test\'s captured output to this log')
+    parser.add_argument('--category-cache', default=DEFAULT_CATEGORY_CACHE, help='Test category cache file')
+    parser.add_argument('--threshold', type=int, default=None, help='Mark tests slower than this (ms)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='No per-test progress lines')
+
+    args = parser.parse_args()
+
+    tests = read_tests(sys.stdin)
+    os.makedirs(args.results_dir, exist_ok=True)
+
+    node_pool = None
+    if args.artifacts and not args.cold and shutil.which('node'):
+        from wenyan_node_pool import DEFAULT_MAX_MEMORY_MB, DEFAULT_MAX_TESTS, NodeWorkerPool
+        node_pool = NodeWorkerPool(args.jobs, args.max_tests_per_worker or DEFAULT_MAX_TESTS,
+                                   args.max_worker_memory or DEFAULT_MAX_MEMORY_MB)
+    categories = CategoryCache(args.category_cache) if args.events or args.detailed_log else None
+    events = open(args.events, 'a', encoding='utf-8') if args.events else None
+    detailed_log = open(args.detailed_log, 'a', encoding='utf-8') if args.detailed_log else None
+    try:
+        results = schedule(tests, args.results_dir, args.jobs, args.timeout, args.command.split(),
+                           load_history(args.history), args.quiet, args.artifacts, node_pool,
+                           events, detailed_log, categories, args.threshold)
+    finally:
+        if node_pool is not None:
+            node_pool.close()
+        for sink in (events, detailed_log):
+            if sink is not None:
+                sink.close()
+        if categories is not None:
+            categories.save()
+    return all(exit_code != 127 for exit_code, _ in results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
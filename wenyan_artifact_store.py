@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Wenyan Build Artifact Store
+Author: Whisky, PR Worker
+
+The single compile stage of the pipeline. Every source is compiled once
+into the store; validation, tests, docs and packaging then read the
+results instead of running the compiler again.
+
+For a source such as tests/算經/簡單測試.wy the store holds:
+
+  build/artifacts/tests/算經/簡單測試.wy.js         compiled JavaScript
+  build/artifacts/tests/算經/簡單測試.wy.fixed.js   after the JS fixer
+  build/artifacts/tests/算經/簡單測試.wy.err        compiler error, if it failed
+
+so shell scripts can check a file's state with a plain `[ -f ]`.
+manifest.json records each source's compile-cache key; sources whose key is
+unchanged are not touched on the next run, and compilations are shared with
+the compile cache of 構建系統.sh.
+
+Usage:
+  python3 wenyan_artifact_store.py compile [SRC.wy | DIR ...] [--jobs N]
+  python3 wenyan_artifact_store.py path SRC.wy [--fixed]
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from wenyan_compile_cache import CompileCache, compiler_version
+from wenyan_dependency_graph import scan_sources
+from wenyan_js_stream_fixer import PROFILES, fix_file
+
+DEFAULT_STORE = os.path.join('build', 'artifacts')
+DEFAULT_FIX_PROFILE = 'comprehensive'
+COMPILE_TIMEOUT = 120
+MANIFEST_NAME = 'manifest.json'
+
+
+class ArtifactStore:
+    """
+    Compiled and fixed JavaScript for every source, keyed like the compile cache
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE, profile_name: str = DEFAULT_FIX_PROFILE,
+                 cache: Optional[CompileCache] = None, version: Optional[str] = None):
+        self.directory = directory
+        self.profile_name = profile_name
+        if version is None:
+            version = cache.version if cache is not None else compiler_version()
+        self.version = version
+        self.cache = cache
+        # Keys only need the version; CompileCache gives us the closure hashing
+        self._keys = cache if cache is not None else CompileCache('.cache', version=version)
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('compilerVersion') != self.version or manifest.get('fixerProfile') != self.profile_name:
+            return {}
+        return manifest.get('sources', {})
+
+    def save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'compilerVersion': self.version, 'fixerProfile': self.profile_name,
+                       'sources': self.manifest}, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.manifest_path)
+
+    def path(self, source_path: str, suffix: str = '.js') -> str:
+        return os.path.join(self.directory, os.path.normpath(source_path) + suffix)
+
+    def _clear(self, source_path: str):
+        for suffix in ('.js', '.fixed.js', '.err'):
+            try:
+                os.remove(self.path(source_path, suffix))
+            except FileNotFoundError:
+                pass
+
+    def compile_one(self, source_path: str) -> Dict:
+        """
+        Produce the artifacts of one source; at most one compiler run
+        """
+        key = self._keys.key(source_path)
+        previous = self.manifest.get(source_path)
+        raw_path = self.path(source_path)
+        if previous and previous.get('key') == key and (
+                os.path.exists(raw_path) if previous['status'] == 'compiled'
+                else os.path.exists(self.path(source_path, '.err'))):
+            return dict(previous, action='unchanged')
+
+        self._clear(source_path)
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+
+        if self.cache is not None and self.cache.lookup(source_path, raw_path):
+            action = 'cached'
+        else:
+            action = 'compiled'
+            error = None
+            try:
+                with open(raw_path, 'wb') as out:
+                    completed = subprocess.run(['wenyan', '-c', source_path], stdout=out,
+                                               stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                               timeout=COMPILE_TIMEOUT)
+                if completed.returncode != 0:
+                    error = completed.stderr.decode('utf-8', 'replace') or f"exit code {completed.returncode}"
+            except subprocess.TimeoutExpired:
+                error = f"compilation timed out after {COMPILE_TIMEOUT}s"
+            except OSError as e:
+                error = str(e)
+            if error is not None:
+                os.remove(raw_path)
+                with open(self.path(source_path, '.err'), 'w', encoding='utf-8') as f:
+                    f.write(error)
+                return {'key': key, 'status': 'failed', 'action': action}
+            if self.cache is not None:
+                self.cache.store(source_path, raw_path)
+
+        fix_file(raw_path, self.path(source_path, '.fixed.js'), PROFILES[self.profile_name])
+        return {'key': key, 'status': 'compiled', 'action': action}
+
+    def compile_all(self, sources: Iterable[str], jobs: Optional[int] = None,
+                    verbose: bool = False) -> Dict[str, int]:
+        """
+        Bring the store up to date for every source, compiling in parallel
+        """
+        sources = [os.path.normpath(source) for source in sources]
+        summary = {'total': len(sources), 'compiled': 0, 'cached': 0, 'unchanged': 0, 'failed': 0}
+        workers = max(1, jobs or os.cpu_count() or 1)
+
+        def run(source_path: str):
+            try:
+                return source_path, self.compile_one(source_path)
+            except Exception as e:
+                return source_path, {'status': 'failed', 'action': 'compiled', 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for source_path, entry in pool.map(run, sources):
+                action = entry.pop('action')
+                if entry['status'] == 'failed':
+                    summary['failed'] += 1
+                    print(f"✗ {source_path}", file=sys.stderr)
+                else:
+                    summary[action] += 1
+                    if verbose:
+                        print(f"✓ {source_path} ({action})")
+                entry.pop('error', None)
+                self.manifest[source_path] = entry
+
+        self.save_manifest()
+        return summary
+
+
+def expand_sources(paths: List[str]) -> List[str]:
+    """
+    Directories become the .wy files below them; no paths means every source
+    """
+    if not paths:
+        return scan_sources()
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                sources.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.wy'))
+        else:
+            sources.append(path)
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile every Wenyan source once into the artifact store')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Artifact store directory')
+    parser.add_argument('--profile', '-p', choices=sorted(PROFILES), default=DEFAULT_FIX_PROFILE,
+                        help='JS fixer profile for the .fixed.js artifacts')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help='Compile sources that changed since the last run')
+    compile_parser.add_argument('paths', nargs='*', help='Sources or directories (default: libs, tests, examples, root)')
+    compile_parser.add_argument('--jobs', '-j', type=int, default=None, help='Parallel compilations (default: CPU count)')
+    compile_parser.add_argument('--no-cache', action='store_true', help='Do not use the compile cache')
+    compile_parser.add_argument('--verbose', '-v', action='store_true', help='List every source')
+
+    path_parser = subparsers.add_parser('path', help='Print the artifact path of a source')
+    path_parser.add_argument('source')
+    path_parser.add_argument('--fixed', action='store_true', help='Path of the fixer-processed JavaScript')
+
+    args = parser.parse_args()
+
+    if args.command == 'path':
+        print(os.path.join(args.store, os.path.normpath(args.source) + ('.fixed.js' if args.fixed else '.js')))
+        return True
+
+    cache = None if args.no_cache else CompileCache.from_config()
+    store = ArtifactStore(args.store, args.profile, cache)
+    summary = store.compile_all(expand_sources(args.paths), args.jobs, args.verbose)
+    print(f"Artifacts for {summary['total']} sources: {summary['compiled']} compiled, "
+          f"{summary['cached']} from cache, {summary['unchanged']} unchanged, {summary['failed']} failed")
+    return summary['failed'] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Wenyan Compile Cache
+Author: Whisky, PR Worker
+
+Content-addressed store of compiled JavaScript for 構建系統.sh. An entry's key
+is the hash of the source file, of every file in its import closure (see
+wenyan_imports.py) and of the `wenyan --version` string, so editing a library
+invalidates exactly the files that import it and a compiler upgrade
+invalidates everything.
+
+Settings come from the "caching" section of build.config.json: "enabled" and
+"buildCache" switch the cache on, entries live under "cacheDirectory"/compile,
+and entries unused for "maxAge" seconds or beyond "maxSize" bytes in total
+(least recently used first) are removed by `evict`.
+
+Usage:
+  python3 wenyan_compile_cache.py lookup SRC.wy [--output OUT.js]   exit 0 on a hit
+  python3 wenyan_compile_cache.py store SRC.wy COMPILED.js
+  python3 wenyan_compile_cache.py evict | stats | clear
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from wenyan_imports import closure_digest
+
+CONFIG_FILE = 'build.config.json'
+CACHE_FORMAT = '1'
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'buildCache': True,
+    'cacheDirectory': '.cache',
+    'maxAge': 86400,
+    'maxSize': 256 * (1 << 20),
+}
+
+
+def load_settings(config_path: str = CONFIG_FILE) -> Dict:
+    """
+    Caching settings from build.config.json, falling back to the defaults
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        settings.update(config.get('buildConfig', {}).get('caching', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def compiler_version() -> str:
+    """
+    `wenyan --version`, or WENYAN_COMPILER_VERSION when the caller already queried it
+
+    WENYAN_VERSION is not used: CI sets it to the npm tag to install (e.g. 'latest'),
+    which would key every artifact on the tag rather than the compiler actually run.
+    """
+    version = os.environ.get('WENYAN_COMPILER_VERSION')
+    if version:
+        return version
+    try:
+        completed = subprocess.run(['wenyan', '--version'], capture_output=True, text=True, timeout=30)
+        return completed.stdout.strip() or completed.stderr.strip() or 'unknown'
+    except (OSError, subprocess.TimeoutExpired):
+        return 'unknown'
+
+
+class CompileCache:
+    """
+    Compiled JavaScript stored under <cacheDirectory>/compile/<key[:2]>/<key>.js
+    """
+
+    def __init__(self, directory: str, max_age: float = DEFAULT_SETTINGS['maxAge'],
+                 max_size: int = DEFAULT_SETTINGS['maxSize'], version: Optional[str] = None):
+        self.directory = os.path.join(directory, 'compile')
+        self.max_age = max_age
+        self.max_size = max_size
+        self.version = version if version is not None else compiler_version()
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_FILE) -> Optional['CompileCache']:
+        settings = load_settings(config_path)
+        if not (settings.get('enabled') and settings.get('buildCache')):
+            return None
+        return cls(settings['cacheDirectory'], settings['maxAge'], settings['maxSize'])
+
+    def key(self, source_path: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT}\0{self.version}\0".encode('utf-8'))
+        digest.update(closure_digest([source_path]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.js')
+
+    def lookup(self, source_path: str, output_path: Optional[str] = None) -> bool:
+        """
+        Copy the cached JavaScript to output_path; False on a miss
+        """
+        entry = self.entry_path(self.key(source_path))
+        if not os.path.isfile(entry):
+            return False
+        if output_path:
+            directory = os.path.dirname(output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            shutil.copyfile(entry, output_path)
+        # mtime marks last use, which is what eviction looks at
+        os.utime(entry)
+        return True
+
+    def store(self, source_path: str, compiled_path: str) -> str:
+        entry = self.entry_path(self.key(source_path))
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        temp_path = f"{entry}.{os.getpid()}.tmp"
+        shutil.copyfile(compiled_path, temp_path)
+        os.replace(temp_path, entry)
+        return entry
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """
+        (path, last use, size) of every entry
+        """
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue
+                found.append((path, status.st_mtime, status.st_size))
+        return found
+
+    def evict(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop entries older than max_age, then least recently used ones until
+        the cache fits in max_size
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        freed = 0
+        kept = []
+        for path, last_use, size in self.entries():
+            if path.endswith('.tmp') or now - last_use > self.max_age:
+                os.remove(path)
+                removed += 1
+                freed += size
+            else:
+                kept.append((path, last_use, size))
+
+        total = sum(size for _, _, size in kept)
+        remaining = len(kept)
+        for path, _, size in sorted(kept, key=lambda entry: entry[1]):
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            removed += 1
+            freed += size
+            total -= size
+            remaining -= 1
+
+        return {'removed': removed, 'freedBytes': freed, 'remaining': remaining, 'totalBytes': total}
+
+    def stats(self) -> Dict[str, int]:
+        entries = self.entries()
+        return {'entries': len(entries), 'totalBytes': sum(size for _, _, size in entries)}
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed cache of compiled Wenyan JavaScript')
+    parser.add_argument('--config', default=CONFIG_FILE, help='Build configuration with the caching section')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = subparsers.add_parser('lookup', help='Restore a cached compilation (exit 1 on a miss)')
+    lookup_parser.add_argument('source', help='Wenyan source file')
+    lookup_parser.add_argument('--output', '-o', help='Where to write the cached JavaScript')
+
+    store_parser = subparsers.add_parser('store', help='Record a successful compilation')
+    store_parser.add_argument('source', help='Wenyan source file')
+    store_parser.add_argument('compiled', help='JavaScript produced by wenyan')
+
+    subparsers.add_parser('evict', help='Remove expired entries and trim to maxSize')
+    subparsers.add_parser('stats', help='Print entry count and size')
+    subparsers.add_parser('clear', help='Remove every entry')
+
+    args = parser.parse_args()
+
+    cache = CompileCache.from_config(args.config)
+    if cache is None:
+        # Caching disabled: every lookup misses and nothing is written
+        return args.command != 'lookup'
+
+    if args.command == 'lookup':
+        return cache.lookup(args.source, args.output)
+    if args.command == 'store':
+        cache.store(args.source, args.compiled)
+    elif args.command == 'evict':
+        result = cache.evict()
+        print(f"Evicted {result['removed']} entries ({result['freedBytes']} bytes); "
+              f"{result['remaining']} entries, {result['totalBytes']} bytes kept")
+    elif args.command == 'stats':
+        result = cache.stats()
+        print(f"{result['entries']} entries, {result['totalBytes']} bytes in {cache.directory}")
+    elif args.command == 'clear':
+        cache.clear()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
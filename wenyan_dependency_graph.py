@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Wenyan Dependency Graph and Test Selection
+Author: Whisky, PR Worker
+
+Builds the import graph of every .wy file under libs/, tests/, examples/ and
+the repository root (imports are parsed by wenyan_imports.py) and answers
+"which tests can a change affect?". Parsed imports are cached in
+.cache/import_graph.json and only re-read for files whose size or mtime
+changed.
+
+Many tests under tests/<lib>/ carry their own copy of the functions under
+test instead of importing them, so every test in tests/<lib>/ is also given
+an implicit edge to libs/<lib>/<lib>.wy. A change to libs/曆經/曆經.wy
+therefore selects the 曆經 tests and whatever imports 曆經, and nothing else.
+
+Usage:
+  python3 wenyan_dependency_graph.py select --since origin/main < tests.tsv
+  python3 wenyan_dependency_graph.py select --changed libs/曆經/曆經.wy < tests.tsv
+  python3 wenyan_dependency_graph.py affected FILE ...
+  python3 wenyan_dependency_graph.py graph
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from wenyan_imports import LIBS_DIR, parse_imports, read_source, resolve_import
+
+SOURCE_DIRS = ['libs', 'tests', 'examples']
+TESTS_DIR = 'tests'
+DEFAULT_CACHE = os.path.join('.cache', 'import_graph.json')
+CACHE_FORMAT = 1
+
+
+def scan_sources(root: str = '.') -> List[str]:
+    """
+    Every .wy file the graph covers, as normalised paths relative to root
+    """
+    sources = []
+    for name in sorted(os.listdir(root)):
+        if name.endswith('.wy') and os.path.isfile(os.path.join(root, name)):
+            sources.append(name)
+    for directory in SOURCE_DIRS:
+        for current, dirs, files in os.walk(os.path.join(root, directory)):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.wy'):
+                    sources.append(os.path.normpath(os.path.relpath(os.path.join(current, name), root)))
+    return sources
+
+
+def library_main_file(path: str, root: str = '.') -> Optional[str]:
+    """
+    libs/<lib>/<lib>.wy for a file under tests/<lib>/, if that library exists
+    """
+    parts = os.path.normpath(path).split(os.sep)
+    if len(parts) >= 3 and parts[0] == TESTS_DIR:
+        main_file = os.path.join(LIBS_DIR, parts[1], parts[1] + '.wy')
+        if os.path.isfile(os.path.join(root, main_file)):
+            return main_file
+    return None
+
+
+class DependencyGraph:
+    """
+    file -> files it imports, plus the reverse edges for impact queries
+    """
+
+    def __init__(self, root: str = '.', cache_path: Optional[str] = DEFAULT_CACHE):
+        self.root = root
+        self.cache_path = cache_path
+        self.imports: Dict[str, List[str]] = {}
+        self.unresolved: Dict[str, List[str]] = {}
+        self._importers: Optional[Dict[str, Set[str]]] = None
+
+    def canonical(self, path: str) -> str:
+        """
+        Root-relative path with symlinks resolved (藏書樓/算經.wy -> libs/算經/算經.wy)
+        """
+        full_path = path if os.path.isabs(path) else os.path.join(self.root, path)
+        return os.path.normpath(os.path.relpath(os.path.realpath(full_path), os.path.realpath(self.root)))
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache.get('files', {}) if cache.get('format') == CACHE_FORMAT else {}
+
+    def _save_cache(self, entries: Dict[str, Dict]):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': CACHE_FORMAT, 'files': entries}, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.cache_path)
+
+    def build(self, sources: Optional[Iterable[str]] = None) -> 'DependencyGraph':
+        """
+        Parse (or reuse cached) imports of every source and resolve them
+        """
+        sources = list(sources) if sources is not None else scan_sources(self.root)
+        cached = self._load_cache()
+        entries: Dict[str, Dict] = {}
+
+        for path in sources:
+            full_path = os.path.join(self.root, path)
+            try:
+                status = os.stat(full_path)
+            except OSError:
+                continue
+            stamp = [status.st_size, status.st_mtime_ns]
+            entry = cached.get(path)
+            if not entry or entry.get('stamp') != stamp:
+                entry = {'stamp': stamp, 'imports': parse_imports(read_source(full_path))}
+            entries[path] = entry
+
+            resolved = []
+            for name in entry['imports']:
+                target = resolve_import(name, full_path, self.root)
+                if target is None:
+                    self.unresolved.setdefault(path, []).append(name)
+                else:
+                    resolved.append(self.canonical(target))
+            main_file = library_main_file(path, self.root)
+            if main_file and main_file not in resolved and main_file != path:
+                resolved.append(main_file)
+            self.imports[self.canonical(path)] = resolved
+
+        self._save_cache(entries)
+        self._importers = None
+        return self
+
+    def importers(self) -> Dict[str, Set[str]]:
+        if self._importers is None:
+            self._importers = {}
+            for path, targets in self.imports.items():
+                for target in targets:
+                    self._importers.setdefault(target, set()).add(path)
+        return self._importers
+
+    def affected(self, changed: Iterable[str]) -> Set[str]:
+        """
+        The changed files plus everything that imports them, transitively
+        """
+        importers = self.importers()
+        result: Set[str] = set()
+        pending = deque(self.canonical(path) for path in changed)
+        while pending:
+            path = pending.popleft()
+            if path in result:
+                continue
+            result.add(path)
+            pending.extend(importers.get(path, ()))
+        return result
+
+    def select_tests(self, tests: List[Tuple[str, str]], changed: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        The (file, library) test entries that a change can affect, in input order
+        """
+        affected = self.affected(changed)
+        return [test for test in tests if self.canonical(test[0]) in affected]
+
+
+def _git_lines(arguments: List[str], root: str) -> List[str]:
+    completed = subprocess.run(['git'] + arguments, cwd=root, capture_output=True, check=True)
+    return [line for line in completed.stdout.decode('utf-8').split('\0') if line]
+
+
+def changed_files_since(ref: str, root: str = '.') -> List[str]:
+    """
+    Files that differ from ref in the working tree, plus untracked files
+    """
+    changed = _git_lines(['diff', '--name-only', '-z', ref, '--'], root)
+    changed += _git_lines(['ls-files', '--others', '--exclude-standard', '-z'], root)
+    return [os.path.normpath(path) for path in changed]
+
+
+def read_tests(source) -> List[Tuple[str, str]]:
+    tests = []
+    for line in source:
+        line = line.rstrip('\n')
+        if line:
+            test_file, _, lib_name = line.partition('\t')
+            tests.append((test_file, lib_name))
+    return tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wenyan import graph and change-based test selection')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='Parsed-import cache file')
+    parser.add_argument('--no-cache', action='store_true', help='Parse every file again')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    select_parser = subparsers.add_parser('select', help='Filter "file<TAB>library" test lines on stdin')
+    select_parser.add_argument('--since', help='Git ref to diff the working tree against')
+    select_parser.add_argument('--changed', nargs='*', default=[], help='Changed files')
+    select_parser.add_argument('--changed-list', help='File with one changed path per line')
+
+    affected_parser = subparsers.add_parser('affected', help='List every file a change can affect')
+    affected_parser.add_argument('files', nargs='+')
+
+    subparsers.add_parser('graph', help='Print the import graph')
+
+    args = parser.parse_args()
+    graph = DependencyGraph(cache_path=None if args.no_cache else args.cache).build()
+
+    if args.command == 'graph':
+        for path, targets in sorted(graph.imports.items()):
+            if targets or path in graph.unresolved:
+                print(path)
+                for target in targets:
+                    print(f"  └─ {target}")
+                for name in graph.unresolved.get(path, []):
+                    print(f"  └─ {name} (unresolved)")
+        return True
+
+    if args.command == 'affected':
+        for path in sorted(graph.affected(args.files)):
+            print(path)
+        return True
+
+    changed = list(args.changed)
+    if args.since:
+        changed += changed_files_since(args.since)
+    if args.changed_list:
+        with open(args.changed_list, 'r', encoding='utf-8') as f:
+            changed += [line.strip() for line in f if line.strip()]
+
+    for test_file, lib_name in graph.select_tests(read_tests(sys.stdin), changed):
+        print(f"{test_file}\t{lib_name}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
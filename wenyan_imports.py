@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Wenyan Import Resolution
+Author: Whisky, PR Worker
+
+Finds the files a .wy source depends on. Two import forms are used across
+the tree:
+
+  引用「測試框架」。
+  吾嘗觀「「算經」」之書。方悟「冪」之義。
+  吾嘗觀「「藏書樓」」中「「算經」」之書。
+
+A name is resolved the way the wenyan CLI and our 藏書樓 layout do it:
+relative to the importing file first, then 藏書樓/, then libs/<name>/, then
+the repository root; each as <name>, <name>.wy or <name>/序.wy.
+
+Usage: python3 wenyan_imports.py FILE [FILE ...]   (prints each dependency closure)
+"""
+
+import os
+import re
+import sys
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set
+
+QUOTED = r'(?:「「[^」]+」」|「[^「」]+」)'
+YIN_YONG_PATTERN = re.compile(r'引用(' + QUOTED + r')')
+GUAN_SHU_PATTERN = re.compile(r'吾嘗觀(' + QUOTED + r'(?:[中之]' + QUOTED + r')*)之書')
+SEGMENT_PATTERN = re.compile(r'「「?([^「」]+)」」?')
+
+LIBRARY_ROOT = '藏書樓'
+LIBS_DIR = 'libs'
+INDEX_FILE = '序.wy'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def parse_imports(text: str) -> List[str]:
+    """
+    Imported names in source order, e.g. ['測試框架', '藏書樓/算經']
+    """
+    found = []
+    for match in YIN_YONG_PATTERN.finditer(text):
+        found.append((match.start(), SEGMENT_PATTERN.search(match.group(1)).group(1)))
+    for match in GUAN_SHU_PATTERN.finditer(text):
+        found.append((match.start(), '/'.join(SEGMENT_PATTERN.findall(match.group(1)))))
+    return [name for _, name in sorted(found)]
+
+
+def _candidates(base: str, name: str) -> List[str]:
+    path = os.path.join(base, name)
+    return [path if path.endswith('.wy') else path + '.wy', os.path.join(path, INDEX_FILE)]
+
+
+def resolve_import(name: str, importer: str, root: str = '.') -> Optional[str]:
+    """
+    Path of the file an import refers to, or None when it cannot be found
+    """
+    name = name.strip()
+    if name.startswith('./') or name.startswith('../'):
+        bases = [os.path.dirname(importer) or '.']
+    elif os.path.isabs(name):
+        bases = ['']
+    else:
+        bases = [os.path.dirname(importer) or '.', os.path.join(root, LIBRARY_ROOT),
+                 os.path.join(root, LIBS_DIR, name.split('/')[-1].replace('.wy', '')), root]
+    for base in bases:
+        for candidate in _candidates(base, name):
+            if os.path.isfile(candidate):
+                return os.path.normpath(candidate)
+    return None
+
+
+def read_source(path: str) -> str:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def dependency_closure(path: str, root: str = '.') -> Dict[str, Optional[str]]:
+    """
+    Every import reachable from path: {import name or resolved file: file or None}
+
+    Resolved dependencies are keyed by their normalised path; names that
+    cannot be resolved are kept (mapped to None) so they still take part in
+    cache keys.
+    """
+    closure: Dict[str, Optional[str]] = {}
+    seen: Set[str] = {os.path.normpath(path)}
+    pending = [os.path.normpath(path)]
+    while pending:
+        current = pending.pop()
+        try:
+            names = parse_imports(read_source(current))
+        except OSError:
+            continue
+        for name in names:
+            resolved = resolve_import(name, current, root)
+            if resolved is None:
+                closure.setdefault(name, None)
+            elif resolved not in seen:
+                seen.add(resolved)
+                closure[resolved] = resolved
+                pending.append(resolved)
+    return closure
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def closure_digest(paths: Iterable[str], root: str = '.') -> str:
+    """
+    One hash over the given files and everything they import
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{os.path.normpath(path)}\0{file_digest(path)}\n".encode('utf-8'))
+        for key, resolved in sorted(dependency_closure(path, root).items()):
+            content = file_digest(resolved) if resolved else 'unresolved'
+            digest.update(f"{key}\0{content}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return False
+    for path in sys.argv[1:]:
+        print(path)
+        for key, resolved in sorted(dependency_closure(path).items()):
+            print(f"  └─ {key}" if resolved else f"  └─ {key} (unresolved)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Batch Wenyan JavaScript Fixer
+Author: Whisky, PR Worker
+
+Post-processes a whole tree of compiled JavaScript in one Python process.
+Inputs are given as directories (e.g. the build/<lib>/ trees written by
+構建系統.sh compile_file), individual files or a file list. Work is spread
+across a process pool sized to the available cores, and an on-disk manifest
+keyed by the input hash plus the fixer version and profile lets unchanged
+files be skipped on the next run.
+
+Usage: python3 wenyan_js_batch_fixer.py build/ [--output-dir DIR] [--jobs N]
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from wenyan_js_stream_fixer import DEFAULT_CHUNK_SIZE, FIXER_VERSION, PROFILES, fix_file
+
+DEFAULT_MANIFEST = os.path.join('.cache', 'js_fixer_manifest.json')
+FIXED_SUFFIX = '.fixed.js'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def discover_inputs(paths: Iterable[str]) -> List[str]:
+    """
+    Expand directories into the compiled .js files they contain
+    """
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith('.js') and not name.endswith(FIXED_SUFFIX):
+                        inputs.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            inputs.append(path)
+        else:
+            print(f"Warning: skipping missing input {path}", file=sys.stderr)
+    return inputs
+
+
+def read_file_list(list_path: str) -> List[str]:
+    """
+    Read one path per line; '-' reads the list from stdin
+    """
+    handle = sys.stdin if list_path == '-' else open(list_path, 'r', encoding='utf-8')
+    try:
+        return [line.strip() for line in handle if line.strip()]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def output_path_for(input_path: str, output_dir: Optional[str]) -> str:
+    """
+    Fixed output goes next to the input, or mirrored under output_dir
+    """
+    base = input_path[:-3] if input_path.endswith('.js') else input_path
+    if output_dir is None:
+        return base + FIXED_SUFFIX
+    relative = os.path.relpath(input_path)
+    if relative.startswith(os.pardir):
+        relative = os.path.abspath(input_path).lstrip(os.sep)
+    return os.path.join(output_dir, relative)
+
+
+def content_key(input_path: str, profile_name: str) -> str:
+    """
+    Hash of the input bytes, the fixer version and the profile
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{FIXER_VERSION}\0{profile_name}\0".encode('utf-8'))
+    with open(input_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Dict]:
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('fixerVersion') != FIXER_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_path: str, entries: Dict[str, Dict]):
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fixerVersion': FIXER_VERSION, 'files': entries}, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, manifest_path)
+
+
+def fix_one(input_path: str, output_path: str, profile_name: str,
+            chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[str, Dict[str, int]]:
+    """
+    Worker entry point: fix a single file and return its statistics
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    stats = fix_file(input_path, output_path, PROFILES[profile_name], chunk_size)
+    return input_path, stats.to_dict()
+
+
+def run_batch(inputs: List[str], output_dir: Optional[str] = None, profile_name: str = 'output_fixer',
+              jobs: Optional[int] = None, manifest_path: Optional[str] = DEFAULT_MANIFEST,
+              force: bool = False, verbose: bool = False) -> Dict[str, int]:
+    """
+    Fix every input not already recorded in the manifest with the same key
+    """
+    manifest = load_manifest(manifest_path) if manifest_path and not force else {}
+    entries: Dict[str, Dict] = dict(manifest)
+    pending: List[Tuple[str, str, str]] = []
+    summary = {'total': len(inputs), 'fixed': 0, 'skipped': 0, 'failed': 0}
+
+    for input_path in inputs:
+        key = content_key(input_path, profile_name)
+        output_path = output_path_for(input_path, output_dir)
+        previous = manifest.get(input_path)
+        if (previous and previous.get('key') == key and previous.get('output') == output_path
+                and os.path.exists(output_path)):
+            summary['skipped'] += 1
+            continue
+        pending.append((input_path, output_path, key))
+
+    if pending:
+        workers = jobs or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending)))
+        keys = {input_path: (output_path, key) for input_path, output_path, key in pending}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fix_one, input_path, output_path, profile_name): input_path
+                for input_path, output_path, _ in pending
+            }
+            for future in as_completed(futures):
+                input_path = futures[future]
+                output_path, key = keys[input_path]
+                try:
+                    _, stats = future.result()
+                except Exception as e:
+                    summary['failed'] += 1
+                    print(f"✗ {input_path}: {e}", file=sys.stderr)
+                    continue
+                entries[input_path] = {'key': key, 'output': output_path, 'stats': stats}
+                summary['fixed'] += 1
+                if verbose:
+                    print(f"✓ {input_path} -> {output_path} "
+                          f"({stats['empty_console_logs']} empty console.log, "
+                          f"{stats['redeclarations']} redeclarations)")
+
+    if manifest_path:
+        save_manifest(manifest_path, entries)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fix a tree of Wenyan JavaScript files in parallel')
+    parser.add_argument('paths', nargs='*', help='Directories or .js files to process')
+    parser.add_argument('--file-list', '-l', help="File with one input path per line ('-' for stdin)")
+    parser.add_argument('--output-dir', '-o', help=f'Mirror outputs here instead of writing *{FIXED_SUFFIX} beside inputs')
+    parser.add_argument('--profile', '-p', choices=sorted(PROFILES), default='output_fixer',
+                        help='Which legacy fixer behaviour to reproduce')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='Skip-cache manifest path')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the manifest')
+    parser.add_argument('--force', '-f', action='store_true', help='Ignore the manifest and fix everything')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+
+    args = parser.parse_args()
+
+    paths = list(args.paths)
+    if args.file_list:
+        paths.extend(read_file_list(args.file_list))
+    if not paths:
+        parser.error('no inputs given')
+
+    inputs = discover_inputs(paths)
+    summary = run_batch(inputs, args.output_dir, args.profile, args.jobs,
+                        None if args.no_cache else args.manifest, args.force, args.verbose)
+
+    print(f"Processed {summary['total']} files: {summary['fixed']} fixed, "
+          f"{summary['skipped']} unchanged, {summary['failed']} failed")
+    return summary['failed'] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Wenyan JavaScript Fixer Service
+Author: Whisky, PR Worker
+
+Long-lived worker that fixes compiled JavaScript on request, so test runners
+pay Python startup once instead of once per file.
+
+Protocol: one JSON object per line on stdin, one JSON reply per line on stdout.
+  request:  {"path": "a.js", "js": "...", "profile": "comprehensive"}
+            "js" may be omitted to read "path" from disk; with "output" the
+            fixed code is written there instead of being returned.
+  reply:    {"ok": true, "path": "a.js", "js": "...", "stats": {...}}
+            {"ok": false, "path": "a.js", "error": "..."}
+
+stats carries the same counters the --verbose fixers print: empty
+console.log() calls found, statements generated, redeclarations rewritten.
+
+Usage: python3 wenyan_js_fixer_service.py [--profile NAME]
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from collections import OrderedDict
+from typing import Dict, Optional, TextIO, Tuple
+
+from wenyan_js_stream_fixer import PROFILES, fix_text
+
+DEFAULT_CACHE_ENTRIES = 256
+
+
+class FixerService:
+    """
+    Request handler with a bounded cache of recent results keyed by content hash
+    """
+
+    def __init__(self, default_profile: str = 'output_fixer', cache_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.default_profile = default_profile
+        self.cache_entries = cache_entries
+        self._cache: 'OrderedDict[str, Tuple[str, Dict[str, int]]]' = OrderedDict()
+        self.requests = 0
+        self.cache_hits = 0
+
+    def fix(self, js_content: str, profile_name: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Fix one JavaScript string, reusing the cached result for repeated input
+        """
+        profile_name = profile_name or self.default_profile
+        profile = PROFILES[profile_name]
+        key = hashlib.sha256(f"{profile_name}\0{js_content}".encode('utf-8')).hexdigest()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        fixed_js, stats = fix_text(js_content, profile)
+        result = (fixed_js, stats.to_dict())
+        if self.cache_entries > 0:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def handle(self, request: Dict) -> Dict:
+        """
+        Answer one decoded request
+        """
+        self.requests += 1
+        path = request.get('path')
+        js_content = request.get('js')
+        if js_content is None:
+            if not path:
+                raise ValueError("request needs 'js' or 'path'")
+            with open(path, 'r', encoding='utf-8') as f:
+                js_content = f.read()
+
+        fixed_js, stats = self.fix(js_content, request.get('profile'))
+
+        reply = {'ok': True, 'path': path, 'stats': stats}
+        output_path = request.get('output')
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(fixed_js)
+            reply['output'] = output_path
+        else:
+            reply['js'] = fixed_js
+        return reply
+
+    def serve(self, source: TextIO, sink: TextIO):
+        """
+        Answer JSON-lines requests until the input is closed
+        """
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            path = None
+            try:
+                request = json.loads(line)
+                path = request.get('path')
+                reply = self.handle(request)
+            except Exception as e:
+                reply = {'ok': False, 'path': path, 'error': str(e)}
+            sink.write(json.dumps(reply, ensure_ascii=False) + '\n')
+            sink.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve Wenyan JavaScript fixes over JSON lines on stdin/stdout')
+    parser.add_argument('--profile', '-p', choices=sorted(PROFILES), default='output_fixer',
+                        help='Profile used when a request does not name one')
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help='Number of recent results kept for repeated inputs (0 disables)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print a summary to stderr on exit')
+
+    args = parser.parse_args()
+
+    service = FixerService(args.profile, args.cache_entries)
+    service.serve(sys.stdin, sys.stdout)
+
+    if args.verbose:
+        print(f"Served {service.requests} requests ({service.cache_hits} cache hits)", file=sys.stderr)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -12,12 +12,17 @@ This script analyzes the generated JavaScript and fixes console.log() calls by:
 2. Looking at preceding context to determine what should be logged
 3. Replacing empty calls with proper console.log(variable) calls
 4. Handling variable redeclarations that cause syntax errors
+
+The command line entry point streams through wenyan_js_stream_fixer; the
+in-memory functions below are kept for existing callers.
 """
 
 import re
 import sys
 import argparse
 
+from wenyan_js_stream_fixer import PROFILES, fix_file
+
 def fix_console_log_calls(js_content):
     """
     Fix empty console.log() calls by inferring what should be logged from context
@@ -124,26 +129,16 @@ def main():
     args = parser.parse_args()
     
     try:
-        # Read input file
-        with open(args.input_file, 'r', encoding='utf-8') as f:
-            raw_js = f.read()
-        
-        if args.verbose:
-            print(f"Processing {len(raw_js)} characters of JavaScript...")
-            print(f"Found {raw_js.count('console.log()')} empty console.log() calls")
-        
-        # Fix the JavaScript
-        fixed_statements = fix_console_log_calls(raw_js)
-        formatted_js = format_javascript(fixed_statements)
-        
-        # Write output file
-        with open(args.output_file, 'w', encoding='utf-8') as f:
-            f.write(formatted_js)
+        # Stream the file through the single-pass engine
+        stats = fix_file(args.input_file, args.output_file, PROFILES['output_fixer'])
         
         if args.verbose:
+            print(f"Processed {stats.characters} characters of JavaScript...")
+            print(f"Found {stats.empty_console_logs} empty console.log() calls")
             print(f"✓ Fixed JavaScript written to {args.output_file}")
-            print(f"Generated {len(fixed_statements)} statements")
-            print(f"Fixed {formatted_js.count('console.log(')} console.log calls")
+            print(f"Generated {stats.statements} statements")
+            print(f"Rewrote {stats.redeclarations} variable redeclarations")
+            print(f"Fixed {stats.console_logs} console.log calls")
         
         return True
         
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Streaming Wenyan JavaScript Post-Processor
+Author: Whisky, PR Worker
+
+Single-pass replacement for the split(';')/regex pipeline shared by
+fix_wenyan_js.py, enhanced_fix_wenyan_js.py, comprehensive_js_fix.py and
+wenyan_js_output_fixer.py.
+
+The input is read in fixed-size chunks and cut into statements by a small
+lexer that understands string, template and regex literals, comments and
+nested braces/parentheses. Each statement is fixed as soon as it is complete:
+1. Empty console.log() calls are filled in from a running last-assignment table
+2. Redeclared `var` bindings are rewritten as plain assignments, tracked per
+   function scope
+3. Optionally, bare-word assignments are quoted (legacy fix_wenyan_js.py rule)
+
+Only a bounded window of statements is held back (for the marker lookahead of
+unresolved console.log() calls), so memory stays flat however large the input.
+
+Usage: python3 wenyan_js_stream_fixer.py [input.js|-] [output.js|-] [--profile NAME]
+"""
+
+import io
+import re
+import sys
+import argparse
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+# Bump whenever a change to the fixes alters the output for the same input
+FIXER_VERSION = '1.1.0'
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+IDENTIFIER = r'[a-zA-Z_$\u4e00-\u9fff][a-zA-Z0-9_$\u4e00-\u9fff]*'
+
+# Statement-level patterns, compiled once and reused for every statement
+ASSIGNMENT_PATTERN = re.compile(r'(?:(?:var|let|const)\s+)?(' + IDENTIFIER + r')\s*=(?!=)')
+VAR_DECLARATION_PATTERN = re.compile(r'var\s+(' + IDENTIFIER + r')\s*=(?!=)')
+BARE_WORD_ASSIGNMENT_PATTERN = re.compile(r'(' + IDENTIFIER + r')=([A-Za-z][A-Za-z0-9\s]*)')
+FUNCTION_HEAD_PATTERN = re.compile(r'\bfunction\b|=>\s*$')
+LEADING_COMMENTS_PATTERN = re.compile(r'(?:\s*(?://[^\n]*\n|/\*.*?\*/))*\s*', re.DOTALL)
+EMPTY_CONSOLE_LOG = 'console.log()'
+
+# Per-mode scanners: jump straight to the next character that can change state
+CODE_SPECIALS = re.compile(r'[;{}()\[\]"\'`/]')
+STRING_SPECIALS = {
+    '"': re.compile(r'["\\\n]'),
+    "'": re.compile(r"['\\\n]"),
+    '`': re.compile(r'[`\\$]'),
+}
+REGEX_SPECIALS = re.compile(r'[/\\\[\n]')
+REGEX_CLASS_SPECIALS = re.compile(r'[\]\\\n]')
+
+# A '/' after one of these characters starts a regex literal, otherwise it divides
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                  'delete', 'void', 'throw', 'instanceof', 'yield', 'await'}
+TRAILING_WORD_PATTERN = re.compile(r'[A-Za-z_$]+$')
+REGEX_CONTEXT = 16
+
+# Fallback markers searched around a console.log() with no assignment context
+CONTEXT_MARKERS = [
+    (('測試全部通過', 'All Tests PASSED'), 'console.log("測試全部通過")'),
+    (('🎉',), 'console.log("🎉")'),
+    (('基礎功能測試',), 'console.log("=== 基礎功能測試 ===")'),
+    (('高級功能測試',), 'console.log("=== 高級功能測試 ===")'),
+    (('邊界條件測試',), 'console.log("=== 邊界條件測試 ===")'),
+    (('測試完成',), 'console.log("===== 測試完成 =====")'),
+]
+MARKER_LOOKBEHIND = 5
+MARKER_LOOKAHEAD = 4
+
+# Finished statements are written in batches of this many, one sink.write() each
+FLUSH_BATCH = 256
+
+
+@dataclass(frozen=True)
+class FixerProfile:
+    """Behaviour of one of the legacy post-processors"""
+    context_window: int
+    fallback_message: str
+    use_markers: bool = False
+    quote_bare_words: bool = False
+    rewrite_redeclarations: bool = True
+
+
+PROFILES: Dict[str, FixerProfile] = {
+    # wenyan_js_output_fixer.py: 9-statement lookback, marker fallback
+    'output_fixer': FixerProfile(9, 'DEBUG: Test execution', use_markers=True),
+    # comprehensive_js_fix.py: 4-statement lookback
+    'comprehensive': FixerProfile(4, 'DEBUG: Output'),
+    # enhanced_fix_wenyan_js.py: previous statement only, quotes bare words
+    'enhanced': FixerProfile(1, 'DEBUG: Output called', quote_bare_words=True,
+                             rewrite_redeclarations=False),
+    # fix_wenyan_js.py: no context inference
+    'basic': FixerProfile(0, 'DEBUG: Wenyan output', quote_bare_words=True),
+}
+
+
+@dataclass
+class FixStats:
+    """Counters reported by the --verbose output of the fixers"""
+    characters: int = 0
+    output_characters: int = 0
+    statements: int = 0
+    empty_console_logs: int = 0
+    console_logs: int = 0
+    redeclarations: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class StatementLexer:
+    """
+    Incremental JavaScript statement splitter.
+
+    feed() accepts arbitrary chunks and yields (text, terminator, comment_tail)
+    tuples for every statement completed so far. The terminator is ';', '{' or
+    '}' at parenthesis depth zero, or '' for trailing text passed by close().
+    comment_tail is True when the text ends inside a line comment and must keep
+    its newline.
+    """
+
+    def __init__(self):
+        self._mode: Optional[str] = None
+        self._escape = False
+        self._paren_depth = 0
+        self._template_braces: List[int] = []
+        self._pieces: List[str] = []
+        self._carry = ''
+        self._last_significant = ''
+        self._comment_tail = False
+
+    def feed(self, chunk: str) -> Iterator[Tuple[str, str, bool]]:
+        if self._carry:
+            chunk = self._carry + chunk
+            self._carry = ''
+        if chunk:
+            yield from self._scan(chunk, final=False)
+
+    def close(self) -> Iterator[Tuple[str, str, bool]]:
+        if self._carry:
+            chunk, self._carry = self._carry, ''
+            yield from self._scan(chunk, final=True)
+        text = ''.join(self._pieces)
+        self._pieces = []
+        if text.strip():
+            yield text, '', self._comment_tail
+
+    def _emit(self, chunk: str, start: int, end: int, terminator: str):
+        if self._pieces:
+            self._pieces.append(chunk[start:end])
+            text = ''.join(self._pieces)
+            self._pieces = []
+        else:
+            text = chunk[start:end]
+        comment_tail = self._comment_tail
+        self._comment_tail = False
+        self._last_significant = terminator
+        return text, terminator, comment_tail
+
+    def _regex_allowed(self, chunk: str, slash: int) -> bool:
+        window = chunk[max(0, slash - REGEX_CONTEXT):slash]
+        if slash < REGEX_CONTEXT:
+            window = ''.join(self._pieces)[-REGEX_CONTEXT:] + window
+        window = window.rstrip()
+        if not window:
+            return self._last_significant == '' or self._last_significant in REGEX_PRECEDERS
+        if window[-1] in REGEX_PRECEDERS:
+            return True
+        word = TRAILING_WORD_PATTERN.search(window)
+        return bool(word) and word.group(0) in REGEX_KEYWORDS
+
+    def _hold(self, chunk: str, start: int, index: int):
+        # Never split a two-character token ('//', '/*', '*/', '${') across chunks
+        self._pieces.append(chunk[start:index])
+        self._carry = chunk[index:]
+
+    def _scan(self, chunk: str, final: bool) -> Iterator[Tuple[str, str, bool]]:
+        pos = 0
+        start = 0
+        length = len(chunk)
+
+        while pos < length:
+            mode = self._mode
+
+            if mode is None:
+                match = CODE_SPECIALS.search(chunk, pos)
+                if not match:
+                    if chunk[pos:].strip():
+                        self._comment_tail = False
+                    break
+                index = match.start()
+                char = chunk[index]
+                if char != '/' or chunk[pos:index].strip():
+                    self._comment_tail = False
+                pos = index + 1
+
+                if char == ';':
+                    if self._paren_depth == 0 and not self._template_braces:
+                        yield self._emit(chunk, start, index, ';')
+                        start = pos
+                elif char == '{':
+                    if self._template_braces:
+                        self._template_braces[-1] += 1
+                    elif self._paren_depth == 0:
+                        yield self._emit(chunk, start, index, '{')
+                        start = pos
+                elif char == '}':
+                    if self._template_braces:
+                        if self._template_braces[-1] == 0:
+                            self._template_braces.pop()
+                            self._mode = '`'
+                        else:
+                            self._template_braces[-1] -= 1
+                    elif self._paren_depth == 0:
+                        yield self._emit(chunk, start, index, '}')
+                        start = pos
+                elif char in '([':
+                    self._paren_depth += 1
+                elif char in ')]':
+                    self._paren_depth = max(0, self._paren_depth - 1)
+                elif char in '"\'`':
+                    self._mode = char
+                    self._comment_tail = False
+                elif char == '/':
+                    if pos == length and not final:
+                        self._hold(chunk, start, index)
+                        return
+                    following = chunk[pos] if pos < length else ''
+                    if following == '/':
+                        self._mode = '//'
+                        pos += 1
+                    elif following == '*':
+                        self._mode = '/*'
+                        pos += 1
+                    else:
+                        if self._regex_allowed(chunk, index):
+                            self._mode = '/'
+                        self._comment_tail = False
+
+            elif mode in STRING_SPECIALS:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = STRING_SPECIALS[mode].search(chunk, pos)
+                if not match:
+                    break
+                index = match.start()
+                char = chunk[index]
+                pos = index + 1
+                if char == '\\':
+                    self._escape = True
+                elif char == '$':
+                    if pos == length and not final:
+                        self._hold(chunk, start, index)
+                        return
+                    if pos < length and chunk[pos] == '{':
+                        self._template_braces.append(0)
+                        self._mode = None
+                        pos += 1
+                elif char == mode or char == '\n':
+                    # An unterminated quote ends at the line break, like the engines do
+                    self._mode = None
+
+            elif mode == '//':
+                index = chunk.find('\n', pos)
+                if index < 0:
+                    break
+                pos = index + 1
+                self._mode = None
+                self._comment_tail = True
+
+            elif mode == '/*':
+                index = chunk.find('*/', pos)
+                if index < 0:
+                    if chunk.endswith('*') and not final:
+                        self._hold(chunk, start, length - 1)
+                        return
+                    break
+                pos = index + 2
+                self._mode = None
+
+            else:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                scanner = REGEX_CLASS_SPECIALS if mode == '[' else REGEX_SPECIALS
+                match = scanner.search(chunk, pos)
+                if not match:
+                    break
+                index = match.start()
+                char = chunk[index]
+                pos = index + 1
+                if char == '\\':
+                    self._escape = True
+                elif char == '\n':
+                    self._mode = None
+                elif mode == '[':
+                    self._mode = '/'
+                elif char == '[':
+                    self._mode = '['
+                else:
+                    self._mode = None
+
+        self._pieces.append(chunk[start:])
+
+
+class _PendingStatement:
+    __slots__ = ('text', 'terminator', 'before', 'after', 'resolved')
+
+    def __init__(self, text: str, terminator: str):
+        self.text = text
+        self.terminator = terminator
+        self.before: Tuple[str, ...] = ()
+        # Only an unresolved console.log() collects the statements that follow it
+        self.after: Optional[List[str]] = None
+        self.resolved = True
+
+
+def _code_start(text: str) -> int:
+    # Statements are stripped, so only one starting with '/' can carry leading comments
+    if text.startswith('/'):
+        return LEADING_COMMENTS_PATTERN.match(text).end()
+    return 0
+
+
+class StreamingFixer:
+    """
+    Applies the post-processing fixes to a stream of statements.
+
+    State is limited to the declared-variable table of the enclosing function
+    scopes, the most recent assignment and a short lookbehind/lookahead window
+    used by the marker fallback.
+    """
+
+    def __init__(self, sink: TextIO, profile: FixerProfile = PROFILES['output_fixer']):
+        self.sink = sink
+        self.profile = profile
+        self.stats = FixStats()
+        self._lexer = StatementLexer()
+        self._scopes: List[Set[str]] = [set()]
+        self._scope_kinds: List[bool] = []
+        self._last_assignment: Optional[str] = None
+        self._since_assignment = 0
+        self._previous_terminator = ';'
+        self._recent: Deque[str] = deque(maxlen=MARKER_LOOKBEHIND)
+        self._pending: Deque[_PendingStatement] = deque()
+        self._unresolved = 0
+        self._line_open = False
+
+    def feed(self, chunk: str):
+        self.stats.characters += len(chunk)
+        for text, terminator, comment_tail in self._lexer.feed(chunk):
+            self._handle(text, terminator, comment_tail)
+        self._flush()
+
+    def close(self) -> FixStats:
+        for text, terminator, comment_tail in self._lexer.close():
+            self._handle(text, terminator, comment_tail)
+        for pending in self._pending:
+            if not pending.resolved:
+                self._resolve(pending)
+        self._flush()
+        if self._line_open:
+            self._write('\n')
+        return self.stats
+
+    def _handle(self, raw: str, terminator: str, comment_tail: bool):
+        text = raw.strip()
+        if comment_tail and text:
+            text += '\n'
+
+        if not text and terminator == ';':
+            if self._previous_terminator == '}':
+                # `f = function () {};` keeps its ';' on the line of the closing brace
+                self._previous_terminator = ';'
+                if self._pending:
+                    self._pending[-1].terminator += ';'
+                else:
+                    self._write(';')
+            # Otherwise drop the empty statements left by ';;' and leading semicolons
+            return
+        self._previous_terminator = terminator
+
+        if self._unresolved:
+            for pending in self._pending:
+                if not pending.resolved:
+                    pending.after.append(raw)
+                    if len(pending.after) > MARKER_LOOKAHEAD:
+                        self._resolve(pending)
+
+        statement = _PendingStatement(text, terminator)
+        if text:
+            self.stats.statements += 1
+            self._fix_statement(statement, raw)
+        self._pending.append(statement)
+        if self.profile.use_markers:
+            self._recent.append(raw)
+
+        if terminator == '{':
+            opens_function = bool(FUNCTION_HEAD_PATTERN.search(text))
+            self._scope_kinds.append(opens_function)
+            if opens_function:
+                self._scopes.append(set())
+        elif terminator == '}' and self._scope_kinds:
+            if self._scope_kinds.pop():
+                self._scopes.pop()
+
+        if len(self._pending) >= FLUSH_BATCH:
+            self._flush()
+
+    def _fix_statement(self, statement: _PendingStatement, raw: str):
+        # Comments in front of a statement are kept but ignored by the fixes
+        text = statement.text
+        prefix_end = _code_start(text)
+        if prefix_end:
+            prefix, code = text[:prefix_end], text[prefix_end:]
+        else:
+            prefix, code = '', text
+        profile = self.profile
+
+        if code == EMPTY_CONSOLE_LOG:
+            self.stats.empty_console_logs += 1
+            self.stats.console_logs += 1
+            if (self._last_assignment is not None
+                    and self._since_assignment < profile.context_window):
+                code = f'console.log({self._last_assignment})'
+            elif profile.use_markers:
+                statement.before = tuple(self._recent)
+                statement.after = [raw]
+                statement.resolved = False
+                self._unresolved += 1
+            else:
+                code = f'console.log("{profile.fallback_message}")'
+            statement.text = prefix + code
+            self._since_assignment += 1
+            return
+
+        if code.startswith('console.log('):
+            self.stats.console_logs += 1
+
+        if profile.rewrite_redeclarations and code.startswith('var'):
+            declaration = VAR_DECLARATION_PATTERN.match(code)
+            if declaration:
+                name = declaration.group(1)
+                scope = self._scopes[-1]
+                if name in scope:
+                    code = code[3:].lstrip()
+                    self.stats.redeclarations += 1
+                else:
+                    scope.add(name)
+
+        if profile.quote_bare_words and statement.terminator == ';':
+            bare = BARE_WORD_ASSIGNMENT_PATTERN.fullmatch(code)
+            if bare:
+                code = f'{bare.group(1)}="{bare.group(2)}"'
+
+        if prefix or code is not text:
+            statement.text = prefix + code
+        assignment = ASSIGNMENT_PATTERN.match(code)
+        if assignment:
+            self._last_assignment = assignment.group(1)
+            self._since_assignment = 0
+        else:
+            self._since_assignment += 1
+
+    def _resolve(self, statement: _PendingStatement):
+        surrounding = ' '.join(statement.before + tuple(statement.after))
+        replacement_text = f'console.log("{self.profile.fallback_message}")'
+        for markers, replacement in CONTEXT_MARKERS:
+            if any(marker in surrounding for marker in markers):
+                replacement_text = replacement
+                break
+        prefix_end = _code_start(statement.text)
+        statement.text = statement.text[:prefix_end] + replacement_text
+        statement.before = ()
+        statement.after = None
+        statement.resolved = True
+        self._unresolved -= 1
+
+    def _write(self, text: str):
+        self.stats.output_characters += len(text)
+        self.sink.write(text)
+
+    def _flush(self):
+        pending = self._pending
+        if not pending or not pending[0].resolved:
+            return
+        # Lines are separated rather than terminated so a later ';' can still join a '}' line
+        lines = []
+        while pending and pending[0].resolved:
+            statement = pending.popleft()
+            lines.append(statement.text + (statement.terminator or ';'))
+        output = '\n'.join(lines)
+        if self._line_open:
+            output = '\n' + output
+        self._line_open = True
+        self._write(output)
+
+
+def fix_stream(source: TextIO, sink: TextIO, profile: FixerProfile = PROFILES['output_fixer'],
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> FixStats:
+    """
+    Fix JavaScript read from source in chunks, writing the result to sink as it goes
+    """
+    fixer = StreamingFixer(sink, profile)
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        fixer.feed(chunk)
+    return fixer.close()
+
+
+def fix_text(js_content: str, profile: FixerProfile = PROFILES['output_fixer']) -> Tuple[str, FixStats]:
+    """
+    Fix an in-memory JavaScript string, returning the fixed text and statistics
+    """
+    sink = io.StringIO()
+    fixer = StreamingFixer(sink, profile)
+    fixer.feed(js_content)
+    stats = fixer.close()
+    return sink.getvalue(), stats
+
+
+def fix_file(input_path: str, output_path: str, profile: FixerProfile = PROFILES['output_fixer'],
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> FixStats:
+    """
+    Fix input_path into output_path; '-' selects stdin/stdout
+    """
+    source = sys.stdin if input_path == '-' else open(input_path, 'r', encoding='utf-8')
+    sink = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    try:
+        return fix_stream(source, sink, profile, chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fix Wenyan JavaScript output in a single streaming pass')
+    parser.add_argument('input_file', nargs='?', default='-', help="Input JavaScript file ('-' for stdin)")
+    parser.add_argument('output_file', nargs='?', default='-', help="Output JavaScript file ('-' for stdout)")
+    parser.add_argument('--profile', '-p', choices=sorted(PROFILES), default='output_fixer',
+                        help='Which legacy fixer behaviour to reproduce')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Read size in characters')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+
+    args = parser.parse_args()
+
+    try:
+        stats = fix_file(args.input_file, args.output_file, PROFILES[args.profile], args.chunk_size)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        return False
+
+    if args.verbose:
+        print(f"Processed {stats.characters} characters of JavaScript...", file=sys.stderr)
+        print(f"Found {stats.empty_console_logs} empty console.log() calls", file=sys.stderr)
+        print(f"Generated {stats.statements} statements", file=sys.stderr)
+        print(f"Rewrote {stats.redeclarations} variable redeclarations", file=sys.stderr)
+        print(f"Fixed {stats.console_logs} console.log calls", file=sys.stderr)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
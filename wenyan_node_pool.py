@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Warm Node Worker Pool
+Author: Whisky, PR Worker
+
+Runs compiled Wenyan tests inside long-lived Node processes
+(wenyan_node_worker.js) instead of starting a fresh `wenyan` CLI per test.
+Each test still gets its own vm context; the pool adds a hard per-test
+deadline (a worker that overruns it is killed and replaced) and recycles
+workers after a number of tests or once their RSS passes a limit.
+
+Used by parallel_test_scheduler.py for --artifacts runs, and as a
+JSON-lines service for shell runners (same pattern as
+wenyan_js_fixer_service.py):
+  request:  {"path": "tests/算經/簡單測試.wy", "output": "out.log", "error": "err.log"}
+  reply:    {"ok": true, "path": "...", "exitCode": 0, "durationMs": 2.1}
+A .wy path is compiled into the artifact store first unless it is already
+there; a .js path is run as is.
+
+Usage: python3 wenyan_node_pool.py serve [--workers N] [--store build/artifacts]
+       python3 wenyan_node_pool.py run FILE.js [FILE.js ...]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import select
+import argparse
+import subprocess
+import threading
+from typing import Dict, List, Optional, TextIO
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wenyan_node_worker.js')
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_TESTS = 200
+DEFAULT_MAX_MEMORY_MB = 512
+TIMEOUT_EXIT_CODE = 124
+# Extra time given to a worker before it is considered hung rather than slow
+DEADLINE_GRACE = 5.0
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+class NodeWorker:
+    """
+    One Node process answering one request at a time
+    """
+
+    def __init__(self, node: str = 'node'):
+        self.process = subprocess.Popen([node, WORKER_SCRIPT], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.tests_run = 0
+        self.rss = 0
+        self._buffer = bytearray()
+        self._next_id = 0
+
+    def _read_line(self, deadline: float) -> Optional[bytes]:
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                raise WorkerCrashed('worker exited')
+            self._buffer.extend(chunk)
+        line, _, rest = bytes(self._buffer).partition(b'\n')
+        self._buffer = bytearray(rest)
+        return line
+
+    def run(self, js_path: str, timeout: float) -> Optional[Dict]:
+        """
+        Run one compiled test; None when the worker missed the hard deadline
+        """
+        self._next_id += 1
+        request = {'id': self._next_id, 'file': os.path.abspath(js_path), 'timeout': int(timeout * 1000)}
+        try:
+            self.process.stdin.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(str(e))
+        line = self._read_line(time.monotonic() + timeout + DEADLINE_GRACE)
+        if line is None:
+            return None
+        reply = json.loads(line)
+        self.tests_run += 1
+        self.rss = reply.get('rss', 0)
+        return reply
+
+    def stop(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+
+class NodeWorkerPool:
+    """
+    Fixed number of warm workers shared by any number of threads
+    """
+
+    def __init__(self, size: Optional[int] = None, max_tests: int = DEFAULT_MAX_TESTS,
+                 max_memory_mb: int = DEFAULT_MAX_MEMORY_MB, node: str = 'node'):
+        self.size = max(1, size or os.cpu_count() or 1)
+        self.max_tests = max_tests
+        self.max_memory = max_memory_mb * (1 << 20)
+        self.node = node
+        self.recycled = 0
+        self._idle: 'queue.Queue[NodeWorker]' = queue.Queue()
+        self._all: List[NodeWorker] = []
+        self._lock = threading.Lock()
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> NodeWorker:
+        worker = NodeWorker(self.node)
+        with self._lock:
+            self._all.append(worker)
+        return worker
+
+    def _retire(self, worker: NodeWorker, kill: bool = False):
+        worker.kill() if kill else worker.stop()
+        with self._lock:
+            self._all.remove(worker)
+            self.recycled += 1
+
+    def run(self, js_path: str, timeout: float = DEFAULT_TIMEOUT) -> Dict:
+        """
+        Run one compiled test on the next idle worker
+        """
+        worker = self._idle.get()
+        try:
+            reply = worker.run(js_path, timeout)
+        except WorkerCrashed as e:
+            self._retire(worker, kill=True)
+            self._idle.put(self._spawn())
+            return {'exitCode': 1, 'stdout': '', 'stderr': f"worker crashed: {e}\n", 'durationMs': 0}
+
+        if reply is None:
+            # Hung outside the vm timeout (e.g. a runaway timer); replace the worker
+            self._retire(worker, kill=True)
+            self._idle.put(self._spawn())
+            return {'exitCode': TIMEOUT_EXIT_CODE, 'stdout': '',
+                    'stderr': f"Test timed out after {timeout:g}s\n", 'durationMs': timeout * 1000}
+
+        if worker.tests_run >= self.max_tests or worker.rss > self.max_memory:
+            self._retire(worker)
+            worker = self._spawn()
+        self._idle.put(worker)
+        return reply
+
+    def close(self):
+        with self._lock:
+            workers = list(self._all)
+            self._all.clear()
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_text(path: Optional[str], text: str):
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def serve(pool: NodeWorkerPool, source: TextIO, sink: TextIO, store=None, timeout: float = DEFAULT_TIMEOUT):
+    """
+    Answer JSON-lines run requests until the input is closed
+    """
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        path = None
+        try:
+            request = json.loads(line)
+            path = request['path']
+            js_path = path
+            if path.endswith('.wy'):
+                if store is None:
+                    raise ValueError('no artifact store to compile .wy files')
+                js_path = store.path(path)
+                if not os.path.exists(js_path) and not os.path.exists(store.path(path, '.err')):
+                    store.manifest[os.path.normpath(path)] = {
+                        k: v for k, v in store.compile_one(path).items() if k != 'action'}
+                    store.save_manifest()
+            error_path = store.path(path, '.err') if store is not None and path.endswith('.wy') else None
+            if error_path and os.path.exists(error_path):
+                with open(error_path, 'r', encoding='utf-8') as f:
+                    result = {'exitCode': 1, 'stdout': '', 'stderr': f.read(), 'durationMs': 0}
+            else:
+                result = pool.run(js_path, float(request.get('timeout', timeout)))
+            write_text(request.get('output'), result['stdout'])
+            write_text(request.get('error'), result['stderr'])
+            reply = {'ok': True, 'path': path, 'exitCode': result['exitCode'], 'durationMs': result['durationMs']}
+            if not request.get('output'):
+                reply['stdout'] = result['stdout']
+            if not request.get('error'):
+                reply['stderr'] = result['stderr']
+        except Exception as e:
+            reply = {'ok': False, 'path': path, 'error': str(e)}
+        sink.write(json.dumps(reply, ensure_ascii=False) + '\n')
+        sink.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run compiled Wenyan tests in warm Node workers')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--timeout', '-t', type=float, default=DEFAULT_TIMEOUT, help='Per-test timeout in seconds')
+    parser.add_argument('--max-tests', type=int, default=DEFAULT_MAX_TESTS, help='Recycle a worker after this many tests')
+    parser.add_argument('--max-memory', type=int, default=DEFAULT_MAX_MEMORY_MB, help='Recycle a worker above this RSS (MB)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='JSON-lines requests on stdin, replies on stdout')
+    serve_parser.add_argument('--store', default=None, help='Artifact store used to compile .wy requests')
+
+    run_parser = subparsers.add_parser('run', help='Run compiled tests and print their output')
+    run_parser.add_argument('files', nargs='+')
+
+    args = parser.parse_args()
+
+    with NodeWorkerPool(args.workers, args.max_tests, args.max_memory) as pool:
+        if args.command == 'serve':
+            store = None
+            if args.store:
+                from wenyan_artifact_store import ArtifactStore
+                from wenyan_compile_cache import CompileCache
+                store = ArtifactStore(args.store, cache=CompileCache.from_config())
+            serve(pool, sys.stdin, sys.stdout, store, args.timeout)
+            return True
+
+        success = True
+        for js_path in args.files:
+            result = pool.run(js_path, args.timeout)
+            sys.stdout.write(result['stdout'])
+            sys.stderr.write(result['stderr'])
+            print(f"{'✓' if result['exitCode'] == 0 else '✗'} {js_path} "
+                  f"(exit {result['exitCode']}, {result['durationMs']:.1f}ms)", file=sys.stderr)
+            success = success and result['exitCode'] == 0
+        return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
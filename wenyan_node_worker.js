@@ -0,0 +1,218 @@
+#!/usr/bin/env node
+/*
+ * Warm Node Worker for Wenyan Tests
+ * Author: Whisky, PR Worker
+ *
+ * Long-lived worker driven by wenyan_node_pool.py. Each request runs one
+ * compiled test in a fresh vm context, so tests share the warm runtime but
+ * not their globals. console output and process.stdout/stderr writes are
+ * captured; process.exit() ends the test, not the worker.
+ *
+ * Protocol: one JSON object per line on stdin, one reply per line on stdout.
+ *   request:  {"id": 1, "file": "build/artifacts/x.wy.js", "timeout": 30000}
+ *   reply:    {"id": 1, "exitCode": 0, "stdout": "...", "stderr": "...",
+ *              "durationMs": 2.4, "rss": 41234432}
+ * exitCode is 124 when the test ran past its timeout. As with `node test.js`,
+ * the test is not finished until every timer it scheduled has fired or been
+ * cleared; timers still pending at the timeout are cut off and reported.
+ */
+
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+const util = require('util');
+const readline = require('readline');
+
+const TIMEOUT_EXIT_CODE = 124;
+const DEFAULT_TIMEOUT_MS = 30000;
+
+class ExitSignal extends Error {
+    constructor(code) {
+        super(`process.exit(${code})`);
+        this.code = code;
+    }
+}
+
+/*
+ * Timers a test schedules, so the worker can wait for them like Node's event
+ * loop would and clear whatever is left, keeping them out of the next test.
+ * A callback that throws (including process.exit) ends the test.
+ */
+class TimerTracker {
+    constructor() {
+        this.pending = new Map();
+        this.failure = null;
+        this.onIdle = null;
+    }
+
+    schedule(create, clear, repeats) {
+        return (callback, ...args) => {
+            if (typeof callback !== 'function') {
+                return create(callback, ...args);
+            }
+            let handle;
+            const run = (...callbackArgs) => {
+                try {
+                    if (!this.failure) callback(...callbackArgs);
+                } catch (error) {
+                    this.fail(error);
+                } finally {
+                    // Forget a one-shot timer only after its callback had the chance to schedule more
+                    if (!repeats) this.forget(handle);
+                }
+            };
+            handle = create(run, ...args);
+            this.pending.set(handle, () => clear(handle));
+            return handle;
+        };
+    }
+
+    cancel(clear) {
+        return (handle) => {
+            clear(handle);
+            this.forget(handle);
+        };
+    }
+
+    forget(handle) {
+        if (this.pending.delete(handle) && this.pending.size === 0 && this.onIdle) {
+            this.onIdle();
+        }
+    }
+
+    fail(error) {
+        this.failure = error;
+        this.clearAll();
+        if (this.onIdle) this.onIdle();
+    }
+
+    clearAll() {
+        this.pending.forEach((clear) => clear());
+        this.pending.clear();
+    }
+
+    /* Resolves true once no timers are pending, false if waitMs passes first */
+    settle(waitMs) {
+        if (this.pending.size === 0 || this.failure) {
+            return Promise.resolve(true);
+        }
+        return new Promise((resolve) => {
+            const deadline = setTimeout(() => {
+                this.onIdle = null;
+                resolve(false);
+            }, waitMs);
+            this.onIdle = () => {
+                clearTimeout(deadline);
+                this.onIdle = null;
+                resolve(true);
+            };
+        });
+    }
+}
+
+function createSandbox(stdout, stderr, timers) {
+    const write = (buffer) => (chunk) => { buffer.push(String(chunk)); return true; };
+    const log = (buffer) => (...args) => { buffer.push(util.format(...args) + '\n'); };
+    const sandboxConsole = {
+        log: log(stdout), info: log(stdout), debug: log(stdout),
+        error: log(stderr), warn: log(stderr), trace: log(stderr),
+    };
+    const sandboxProcess = Object.create(process, {
+        exit: { value: (code) => { throw new ExitSignal(code === undefined ? 0 : code); } },
+        stdout: { value: { write: write(stdout), isTTY: false } },
+        stderr: { value: { write: write(stderr), isTTY: false } },
+    });
+    return {
+        console: sandboxConsole,
+        process: sandboxProcess,
+        require,
+        Buffer,
+        performance,
+        setTimeout: timers.schedule(setTimeout, clearTimeout, false),
+        setInterval: timers.schedule(setInterval, clearInterval, true),
+        setImmediate: timers.schedule(setImmediate, clearImmediate, false),
+        clearTimeout: timers.cancel(clearTimeout),
+        clearInterval: timers.cancel(clearInterval),
+        clearImmediate: timers.cancel(clearImmediate),
+    };
+}
+
+async function runTest(request) {
+    const stdout = [];
+    const stderr = [];
+    const timers = new TimerTracker();
+    const timeout = request.timeout || DEFAULT_TIMEOUT_MS;
+    let exitCode = 0;
+    const start = process.hrtime.bigint();
+    const elapsedMs = () => Number(process.hrtime.bigint() - start) / 1e6;
+
+    try {
+        const code = request.code !== undefined ? request.code : fs.readFileSync(request.file, 'utf8');
+        const context = vm.createContext(createSandbox(stdout, stderr, timers));
+        vm.runInContext(code, context, { filename: request.file || 'test.js', timeout });
+        // Run promise callbacks, then wait for the test's timers until none are left or time runs out;
+        // a timer callback may queue promise work that schedules further timers, so check again after a turn
+        let idle = true;
+        do {
+            await new Promise((resolve) => setImmediate(resolve));
+            idle = await timers.settle(Math.max(timeout - elapsedMs(), 0));
+        } while (idle && !timers.failure && timers.pending.size > 0);
+        if (timers.failure) {
+            throw timers.failure;
+        }
+        if (!idle) {
+            exitCode = TIMEOUT_EXIT_CODE;
+            stderr.push(`Test timed out after ${timeout}ms with ${timers.pending.size} timer(s) still pending; ` +
+                        'output they would have produced was cut off\n');
+        }
+    } catch (error) {
+        if (error instanceof ExitSignal) {
+            exitCode = error.code;
+        } else if (error && error.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+            exitCode = TIMEOUT_EXIT_CODE;
+            stderr.push(`Test timed out after ${timeout}ms\n`);
+        } else {
+            exitCode = 1;
+            stderr.push((error && error.stack ? error.stack : String(error)) + '\n');
+        }
+    } finally {
+        timers.clearAll();
+    }
+
+    return {
+        id: request.id,
+        exitCode,
+        stdout: stdout.join(''),
+        stderr: stderr.join(''),
+        durationMs: elapsedMs(),
+        rss: process.memoryUsage().rss,
+    };
+}
+
+const input = readline.createInterface({ input: process.stdin, terminal: false });
+const queue = [];
+let running = false;
+
+async function drain() {
+    if (running) return;
+    running = true;
+    while (queue.length > 0) {
+        const line = queue.shift();
+        let reply;
+        try {
+            reply = await runTest(JSON.parse(line));
+        } catch (error) {
+            reply = { id: null, exitCode: 1, stdout: '', stderr: String(error), durationMs: 0, rss: 0 };
+        }
+        process.stdout.write(JSON.stringify(reply) + '\n');
+    }
+    running = false;
+}
+
+input.on('line', (line) => {
+    if (line.trim()) {
+        queue.push(line);
+        drain();
+    }
+});
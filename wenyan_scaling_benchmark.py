@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Wenyan Library Scaling Benchmarks
+Author: Whisky, PR Worker
+
+Measures how exported library functions grow with input size. For every
+function in BENCHMARKS a Node harness is generated (build/bench/scaling_suite.js)
+that loads the library's compiled JavaScript from the artifact store, builds
+inputs of size 10, 100, ... 100,000 outside the timed region, and times calls
+in batches long enough for the clock to resolve them.
+
+The growth exponent is the least-squares slope of log(time) against log(n):
+~0 is constant, ~1 linear, ~2 quadratic. A function whose exponent exceeds
+the one implied by its documented complexity (plus --tolerance) is flagged.
+Sizes stop growing once a call exceeds the time budget, or once the last two
+points predict that the next size would.
+
+Parsers additionally give a `bytes` expression for their input; their points
+also record throughput in MB/s, which the summary reports at the largest size.
+
+Results are stored per commit in performance-results/scaling/<commit>.json;
+`history` prints each function's exponent over the stored commits, so the
+commit where a function went quadratic stands out.
+
+Usage:
+  python3 wenyan_scaling_benchmark.py run [--only 列經.陣列排序] [--max-size 10000]
+  python3 wenyan_scaling_benchmark.py history
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+
+from wenyan_artifact_store import DEFAULT_STORE
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_RESULTS_DIR = os.path.join('performance-results', 'scaling')
+SUITE_PATH = os.path.join('build', 'bench', 'scaling_suite.js')
+DEFAULT_TOLERANCE = 0.35
+DEFAULT_BUDGET_MS = 2000
+# Points faster than this per call are dominated by call overhead and left out of the fit
+MIN_FIT_MS = 0.001
+
+# Growth exponent implied by a documented complexity; log factors count as 0
+COMPLEXITY_EXPONENTS = {
+    'O(1)': 0.0,
+    'O(log n)': 0.0,
+    'O(n)': 1.0,
+    'O(n log n)': 1.0,
+    'O(n^2)': 2.0,
+}
+
+# library, function, documented complexity, and a JavaScript expression
+# turning the size n into the argument list. 排序 and 干支 entries record the
+# complexity these functions should have; the rest follow the library docs
+# (tests/算經/性能基準.md for 算經). An optional 'bytes' expression gives the
+# UTF-8 size of the argument list, for reporting throughput.
+BENCHMARKS = [
+    {'library': '列經', 'function': '陣列排序', 'complexity': 'O(n log n)',
+     'args': 'n => [randomArray(n), (a) => (b) => a < b]'},
+    {'library': '列經', 'function': '陣列搜尋', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n), -1]'},
+    {'library': '列經', 'function': '陣列拼接', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n >> 1), randomArray(n - (n >> 1))]'},
+    {'library': '列經', 'function': '視圖切片', 'complexity': 'O(1)',
+     'args': 'n => [randomArray(n), 2, n - 1]'},
+    {'library': '列經', 'function': '陣列折疊', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n), 0, (a) => (b) => a + b]'},
+    {'library': '列經', 'function': '二分搜尋', 'complexity': 'O(log n)',
+     'args': 'n => [Array.from({ length: n }, (_, i) => i), n >> 1]'},
+    {'library': '集經', 'function': '陣列去重', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n)]'},
+    {'library': '析經', 'function': '解析CSV', 'complexity': 'O(n)',
+     'args': 'n => [csvText(n), [",", \'"\', false]]', 'bytes': 'args => Buffer.byteLength(args[0])'},
+    {'library': '析經', 'function': '解析JSON', 'complexity': 'O(n)',
+     'args': 'n => [jsonText(n)]', 'bytes': 'args => Buffer.byteLength(args[0])'},
+    {'library': '析經', 'function': '選取JSON', 'complexity': 'O(n)',
+     'args': 'n => [jsonText(n), ["*", "name"]]', 'bytes': 'args => Buffer.byteLength(args[0])'},
+    {'library': '字符串經', 'function': '字符串替換', 'complexity': 'O(n)',
+     'args': 'n => [randomText(n), "天地", "乾坤"]'},
+    {'library': '字符串經', 'function': '在文字中尋找', 'complexity': 'O(n)',
+     'args': 'n => [randomText(n) + "文言", "文言"]'},
+    {'library': '字符串經', 'function': '字符串劃割', 'complexity': 'O(n)',
+     'args': 'n => [randomText(n), "，"]'},
+    {'library': '算經', 'function': '冪', 'complexity': 'O(log n)',
+     'args': 'n => [1.0000001, n]'},
+    {'library': '算經', 'function': '模冪', 'complexity': 'O(log n)',
+     'args': 'n => [3, n, 1000003]'},
+    {'library': '算經', 'function': '平方根', 'complexity': 'O(1)',
+     'args': 'n => [n]'},
+    {'library': '算經', 'function': '正弦', 'complexity': 'O(1)',
+     'args': 'n => [n]'},
+    {'library': '算經', 'function': '自然對數', 'complexity': 'O(1)',
+     'args': 'n => [n]'},
+    {'library': '算經', 'function': '陣列標準差', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n)]'},
+    {'library': '算經', 'function': '陣列眾數', 'complexity': 'O(n)',
+     'args': 'n => [randomArray(n)]'},
+    {'library': '曆經', 'function': '日期間隔', 'complexity': 'O(1)',
+     'args': 'n => [1900, 1, 1, 1900 + n, 3, 15]'},
+    {'library': '曆經', 'function': '取日干支', 'complexity': 'O(1)',
+     'args': 'n => [1900 + n, 3, 15]'},
+]
+
+HARNESS_TEMPLATE = r"""'use strict';
+// Generated by wenyan_scaling_benchmark.py; do not edit.
+const fs = require('fs');
+const vm = require('vm');
+
+const CASES = [
+__CASES__
+];
+
+const config = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+let seed = 42;
+function random() {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed / 2147483648;
+}
+function randomArray(n) {
+    return Array.from({ length: n }, () => Math.floor(random() * 1000000));
+}
+const TEXT = '天地玄黃宇宙洪荒日月盈昃辰宿列張，';
+function randomText(n) {
+    let text = '';
+    for (let i = 0; i < n; i++) text += TEXT[Math.floor(random() * TEXT.length)];
+    return text;
+}
+// n records of three fields; every fourth note is quoted and holds the delimiter and an escaped quote
+function csvText(n) {
+    const lines = ['id,name,note'];
+    for (let i = 0; i < n; i++) {
+        const note = i % 4 === 0 ? '"' + randomText(6) + ',""' + randomText(2) + '"' + '"' + '"' : randomText(8);
+        lines.push(i + ',' + randomText(4) + ',' + note);
+    }
+    return lines.join('\r\n') + '\r\n';
+}
+// An array of n objects, each with a nested subtree that path selection skips
+function jsonText(n) {
+    return JSON.stringify(Array.from({ length: n }, (_, i) => ({
+        id: i, name: randomText(4), score: random() * 100, tags: [randomText(2), null, true],
+        detail: { text: randomText(12), values: randomArray(4) },
+    })));
+}
+
+function loadLibrary(path, names) {
+    const quiet = () => {};
+    const context = vm.createContext({
+        console: { log: quiet, info: quiet, warn: quiet, error: quiet, debug: quiet },
+        process, performance, require, Buffer,
+    });
+    vm.runInContext(fs.readFileSync(path, 'utf8'), context, { filename: path });
+    const exports = {};
+    for (const name of names) {
+        try { exports[name] = vm.runInContext(name, context); } catch (error) { /* not exported */ }
+    }
+    return exports;
+}
+
+// Wenyan compiles multi-argument functions curried: f(a)(b)
+function call(fn, args) {
+    if (fn.length > 1) return fn(...args);
+    let result = fn;
+    for (const arg of args) result = result(arg);
+    return args.length === 0 ? fn() : result;
+}
+
+function batch(fn, args, reps) {
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < reps; i++) call(fn, args);
+    return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+function measure(fn, args) {
+    let reps = 1;
+    let elapsed = batch(fn, args, reps);
+    while (elapsed < config.minBatchMs && reps < (1 << 20) && elapsed < config.budgetMs) {
+        reps *= 2;
+        elapsed = batch(fn, args, reps);
+    }
+    const samples = [elapsed / reps];
+    for (let i = 1; i < config.samples && elapsed < config.budgetMs; i++) {
+        samples.push(batch(fn, args, reps) / reps);
+    }
+    samples.sort((a, b) => a - b);
+    return samples[samples.length >> 1];
+}
+
+function emit(record) {
+    process.stdout.write(JSON.stringify(record) + '\n');
+}
+
+const libraries = {};
+for (const benchmark of CASES) {
+    const path = config.libraries[benchmark.library];
+    try {
+        if (!libraries[benchmark.library]) {
+            const names = CASES.filter((c) => c.library === benchmark.library).map((c) => c.function);
+            libraries[benchmark.library] = loadLibrary(path, names);
+        }
+    } catch (error) {
+        emit({ library: benchmark.library, function: benchmark.function, error: 'load failed: ' + error.message });
+        continue;
+    }
+    const fn = libraries[benchmark.library][benchmark.function];
+    if (typeof fn !== 'function') {
+        emit({ library: benchmark.library, function: benchmark.function, error: 'not exported by ' + path });
+        continue;
+    }
+    let previous = null;
+    for (const n of config.sizes) {
+        if (previous && previous.length === 2) {
+            // Predict from the last two points; skip sizes that would blow the budget
+            const [a, b] = previous;
+            const slope = Math.max(0, Math.log(b.ms / a.ms) / Math.log(b.n / a.n));
+            if (b.ms * Math.pow(n / b.n, slope) > config.budgetMs) {
+                emit({ library: benchmark.library, function: benchmark.function, n, skipped: 'predicted over budget' });
+                break;
+            }
+        }
+        let ms;
+        let bytes;
+        try {
+            const args = benchmark.args(n);
+            if (benchmark.bytes) bytes = benchmark.bytes(args);
+            ms = measure(fn, args);
+        } catch (error) {
+            emit({ library: benchmark.library, function: benchmark.function, n, error: String(error && error.message || error) });
+            break;
+        }
+        emit({ library: benchmark.library, function: benchmark.function, n, ms, bytes });
+        previous = previous ? [previous[previous.length - 1], { n, ms }] : [{ n, ms }];
+        if (ms > config.budgetMs) break;
+    }
+}
+"""
+
+
+def generate_suite(benchmarks: List[Dict], path: str = SUITE_PATH) -> str:
+    """
+    Write the Node harness for these benchmarks
+    """
+    cases = ',\n'.join(
+        f"    {{ library: {json.dumps(b['library'], ensure_ascii=False)}, "
+        f"function: {json.dumps(b['function'], ensure_ascii=False)}, args: {b['args']}"
+        + (f", bytes: {b['bytes']}" if 'bytes' in b else '') + " }"
+        for b in benchmarks)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HARNESS_TEMPLATE.replace('__CASES__', cases))
+    return path
+
+
+def library_artifacts(libraries: List[str], store_dir: str = DEFAULT_STORE) -> Dict[str, str]:
+    """
+    Compiled JavaScript of each library's main file, compiling it into the store if needed
+    """
+    from wenyan_artifact_store import ArtifactStore
+    from wenyan_compile_cache import CompileCache
+
+    store = ArtifactStore(store_dir, cache=CompileCache.from_config())
+    paths = {}
+    for library in libraries:
+        source = os.path.join('libs', library, library + '.wy')
+        entry = store.compile_one(source)
+        entry.pop('action', None)
+        store.manifest[source] = entry
+        # The fixed output is what the test runs execute; fall back to the raw compile
+        fixed = store.path(source, '.fixed.js')
+        paths[library] = fixed if os.path.exists(fixed) else store.path(source)
+    store.save_manifest()
+    return paths
+
+
+def fit_exponent(points: List[Dict]) -> Optional[float]:
+    """
+    Least-squares slope of log(ms) over log(n)
+    """
+    usable = [(math.log(p['n']), math.log(p['ms'])) for p in points if p.get('ms', 0) >= MIN_FIT_MS]
+    if len(usable) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    spread = sum((x - mean_x) ** 2 for x, _ in usable)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / spread
+
+
+def throughput(bytes_count: int, ms: float) -> Optional[float]:
+    """
+    MB/s (2^20 bytes) for one call over bytes_count of input
+    """
+    if ms <= 0:
+        return None
+    return bytes_count / (1 << 20) / (ms / 1000)
+
+
+def current_commit() -> str:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, check=True)
+        commit = completed.stdout.decode().strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', 'libs'], capture_output=True).returncode
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(benchmarks: List[Dict], sizes: List[int], budget_ms: float, tolerance: float,
+              store_dir: str = DEFAULT_STORE, timeout: float = 1800) -> Dict:
+    suite_path = generate_suite(benchmarks)
+    config = {
+        'libraries': library_artifacts(sorted({b['library'] for b in benchmarks}), store_dir),
+        'sizes': sizes,
+        'budgetMs': budget_ms,
+        'minBatchMs': 20,
+        'samples': 5,
+    }
+    config_path = os.path.join(os.path.dirname(suite_path), 'scaling_config.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    results = {'commit': current_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'sizes': sizes, 'tolerance': tolerance, 'functions': {}}
+    for benchmark in benchmarks:
+        results['functions'][f"{benchmark['library']}.{benchmark['function']}"] = {
+            'complexity': benchmark['complexity'], 'points': []}
+
+    process = subprocess.Popen(['node', suite_path, config_path], stdout=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    for line in process.stdout:
+        record = json.loads(line)
+        key = f"{record['library']}.{record['function']}"
+        entry = results['functions'][key]
+        if 'ms' in record:
+            point = {'n': record['n'], 'ms': record['ms']}
+            line = f"  {key:<16} n={record['n']:>7}: {record['ms']:12.4f} ms"
+            if record.get('bytes') is not None:
+                point['bytes'] = record['bytes']
+                point['mbPerSecond'] = throughput(record['bytes'], record['ms'])
+                if point['mbPerSecond'] is not None:
+                    line += f"  {point['mbPerSecond']:8.3f} MB/s"
+            entry['points'].append(point)
+            print(line)
+        elif 'skipped' in record:
+            entry['skipped'] = f"n={record['n']}: {record['skipped']}"
+        else:
+            entry['error'] = record['error']
+            print(f"  {key:<16} ✗ {record['error']}")
+        if time.monotonic() > deadline:
+            process.kill()
+            break
+    process.wait()
+
+    for key, entry in results['functions'].items():
+        exponent = fit_exponent(entry['points'])
+        allowed = COMPLEXITY_EXPONENTS[entry['complexity']] + tolerance
+        entry['exponent'] = exponent
+        entry['flagged'] = exponent is not None and exponent > allowed
+        rates = [p for p in entry['points'] if p.get('mbPerSecond') is not None]
+        if rates:
+            entry['mbPerSecond'] = rates[-1]['mbPerSecond']
+    return results
+
+
+def save_results(results: Dict, results_dir: str = DEFAULT_RESULTS_DIR) -> str:
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{results['commit']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def print_summary(results: Dict):
+    print(f"\n{'function':<18}{'documented':<13}{'exponent':>9}{'MB/s':>10}")
+    for key, entry in results['functions'].items():
+        exponent = f"{entry['exponent']:.2f}" if entry['exponent'] is not None else '-'
+        rate = f"{entry['mbPerSecond']:.3f}" if entry.get('mbPerSecond') is not None else '-'
+        mark = '✗ exceeds documented complexity' if entry['flagged'] else ''
+        print(f"{key:<18}{entry['complexity']:<13}{exponent:>9}{rate:>10}  {mark}")
+
+
+def print_history(results_dir: str = DEFAULT_RESULTS_DIR):
+    """
+    Exponent of every function per stored commit, oldest commit first
+    """
+    runs = []
+    for name in os.listdir(results_dir) if os.path.isdir(results_dir) else []:
+        if name.endswith('.json'):
+            with open(os.path.join(results_dir, name), 'r', encoding='utf-8') as f:
+                runs.append(json.load(f))
+    runs.sort(key=lambda run: run['timestamp'])
+    functions = sorted({key for run in runs for key in run['functions']})
+    print(f"{'commit':<16}" + ''.join(f"{key.split('.', 1)[1]:>10}" for key in functions))
+    for run in runs:
+        cells = []
+        for key in functions:
+            entry = run['functions'].get(key, {})
+            exponent = entry.get('exponent')
+            cell = f"{exponent:.2f}" if exponent is not None else '-'
+            cells.append(f"{cell + ('!' if entry.get('flagged') else ''):>10}")
+        print(f"{run['commit']:<16}" + ''.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit growth exponents of exported Wenyan library functions')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR, help='Per-commit result files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Benchmark and store the results for this commit')
+    run_parser.add_argument('--only', action='append', help='Only this function, e.g. 列經.陣列排序 (repeatable)')
+    run_parser.add_argument('--max-size', type=int, default=None, help='Drop sizes above this')
+    run_parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS, help='Stop growing n past this per-call time (ms)')
+    run_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Allowed exponent above the documented complexity')
+    run_parser.add_argument('--store', default=DEFAULT_STORE, help='Artifact store with the compiled libraries')
+    run_parser.add_argument('--no-save', action='store_true', help='Do not write the per-commit result file')
+    run_parser.add_argument('--strict', action='store_true', help='Exit non-zero when a function is flagged')
+
+    subparsers.add_parser('history', help='Exponents over the stored commits')
+    subparsers.add_parser('generate', help=f'Only write {SUITE_PATH}')
+
+    args = parser.parse_args()
+
+    if args.command == 'history':
+        print_history(args.results_dir)
+        return True
+    if args.command == 'generate':
+        print(generate_suite(BENCHMARKS))
+        return True
+
+    benchmarks = [b for b in BENCHMARKS if not args.only or f"{b['library']}.{b['function']}" in args.only]
+    sizes = [n for n in DEFAULT_SIZES if args.max_size is None or n <= args.max_size]
+    results = run_suite(benchmarks, sizes, args.budget, args.tolerance, args.store)
+    print_summary(results)
+    if not args.no_save:
+        print(f"✓ Results saved to {save_results(results, args.results_dir)}")
+    flagged = [key for key, entry in results['functions'].items() if entry['flagged']]
+    return not (args.strict and flagged)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
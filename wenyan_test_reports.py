@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Wenyan Test Event Log and Reports
+Author: Whisky, PR Worker
+
+The test runner writes one JSON object per finished test to
+test_events_<timestamp>.jsonl:
+
+  {"file": "tests/算經/簡單測試.wy", "library": "算經", "category": "unit",
+   "status": "passed", "exitCode": 0, "durationMs": 12, "outputBytes": 418}
+
+The HTML, JSON and JUnit XML reports are rendered from that file once, at
+the end of the run. Rendering reads the log twice (totals first, then one
+row per event), so memory stays constant however many tests there are, and
+nothing is forked per test.
+
+Test categories come from the test source (單元測試 / 集成測試 / 性能測試
+markers, as the runner always classified them) and are cached by file hash
+in .cache/test_categories.json.
+
+Usage: python3 wenyan_test_reports.py EVENTS.jsonl [--html F] [--json F] [--junit F] [--shell-summary]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from html import escape
+from typing import Dict, Iterator, Optional, TextIO
+from xml.sax.saxutils import quoteattr
+
+CONFIG_FILE = 'build.config.json'
+DEFAULT_CATEGORY_CACHE = os.path.join('.cache', 'test_categories.json')
+DEFAULT_THRESHOLD_MS = 1000
+PASS_PATTERN = re.compile('測試全部通過|All Tests PASSED|🎉'.encode('utf-8'))
+CATEGORY_PATTERNS = [
+    ('unit', re.compile(r'單元測試|unit.*test')),
+    ('integration', re.compile(r'集成測試|integration.*test')),
+    ('performance', re.compile(r'性能測試|performance.*test')),
+]
+CATEGORIES = ['unit', 'integration', 'performance']
+OUTPUT_SCAN_BLOCK = 1 << 16
+
+
+class CategoryCache:
+    """
+    Test category per source file, keyed by the file's content hash
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CATEGORY_CACHE):
+        self.path = path
+        self._entries: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def classify(self, test_file: str) -> str:
+        try:
+            with open(test_file, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return 'unit'
+        key = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            category = self._entries.get(key)
+        if category is None:
+            text = content.decode('utf-8', 'replace')
+            category = next((name for name, pattern in CATEGORY_PATTERNS if pattern.search(text)), 'unit')
+            with self._lock:
+                self._entries[key] = category
+                self._dirty = True
+        return category
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+
+def output_passed(output_path: str) -> bool:
+    """
+    Whether captured output announces success, scanned in blocks
+    """
+    tail = b''
+    try:
+        with open(output_path, 'rb') as f:
+            for block in iter(lambda: f.read(OUTPUT_SCAN_BLOCK), b''):
+                if PASS_PATTERN.search(tail + block):
+                    return True
+                # Keep enough bytes to catch a marker split across blocks
+                tail = block[-32:]
+    except OSError:
+        pass
+    return False
+
+
+def make_event(test_file: str, library: str, exit_code: int, duration_ms: int,
+               output_path: str, category: str) -> Dict:
+    """
+    One test's event, with the same pass/skip/fail rules the runner always used
+    """
+    if exit_code != 0:
+        status = 'failed'
+    elif output_passed(output_path):
+        status = 'passed'
+    else:
+        status = 'skipped'
+    try:
+        output_bytes = os.path.getsize(output_path)
+    except OSError:
+        output_bytes = 0
+    return {'file': test_file, 'library': library, 'category': category, 'status': status,
+            'exitCode': exit_code, 'durationMs': duration_ms, 'outputBytes': output_bytes}
+
+
+def write_event(sink: TextIO, event: Dict):
+    sink.write(json.dumps(event, ensure_ascii=False) + '\n')
+    sink.flush()
+
+
+def read_events(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(events_path: str, threshold_ms: int) -> Dict:
+    """
+    First pass: totals only
+    """
+    summary = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0, 'slow': 0, 'testDurationMs': 0,
+               'categories': {name: 0 for name in CATEGORIES}}
+    for event in read_events(events_path):
+        summary['total'] += 1
+        summary[event['status']] = summary.get(event['status'], 0) + 1
+        summary['categories'][event.get('category', 'unit')] = summary['categories'].get(event.get('category', 'unit'), 0) + 1
+        summary['testDurationMs'] += event['durationMs']
+        if event['durationMs'] > threshold_ms:
+            summary['slow'] += 1
+    summary['successRate'] = summary['passed'] * 100 // summary['total'] if summary['total'] else 0
+    return summary
+
+
+def _percent(count: int, total: int) -> int:
+    return count * 100 // (total if total > 0 else 1)
+
+
+def render_html(events_path: str, summary: Dict, meta: Dict, out: TextIO):
+    out.write(f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>文言標準庫測試報告 - Wenyan Stdlib Test Report</title>
+    <style>
+        body {{ font-family: 'Microsoft YaHei', Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }}
+        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+        h1 {{ color: #2c3e50; text-align: center; border-bottom: 3px solid #3498db; padding-bottom: 10px; }}
+        h2 {{ color: #34495e; border-left: 4px solid #3498db; padding-left: 10px; }}
+        .stats {{ display: flex; justify-content: space-around; margin: 20px 0; }}
+        .stat-box {{ text-align: center; padding: 15px; border-radius: 8px; min-width: 120px; }}
+        .passed {{ background-color: #d4edda; color: #155724; }}
+        .failed {{ background-color: #f8d7da; color: #721c24; }}
+        .skipped {{ background-color: #fff3cd; color: #856404; }}
+        .total {{ background-color: #d1ecf1; color: #0c5460; }}
+        .test-item {{ margin: 10px 0; padding: 10px; border-radius: 5px; }}
+        .test-passed {{ background-color: #d4edda; }}
+        .test-failed {{ background-color: #f8d7da; }}
+        .test-skipped {{ background-color: #fff3cd; }}
+        .progress-bar {{ width: 100%; height: 20px; background-color: #e9ecef; border-radius: 10px; overflow: hidden; }}
+        .progress-fill {{ height: 100%; background-color: #28a745; transition: width 0.3s ease; }}
+        .timestamp {{ text-align: right; color: #6c757d; font-size: 0.9em; }}
+        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
+        th, td {{ padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }}
+        th {{ background-color: #f8f9fa; }}
+        .warning {{ color: #856404; }}
+        .error {{ color: #721c24; }}
+        .success {{ color: #155724; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🧪 文言標準庫測試報告<br>Wenyan Standard Library Test Report</h1>
+        <div class="timestamp">生成時間 Generated: {escape(meta['generated'])}</div>
+""")
+    for event in read_events(events_path):
+        library = escape(event['library'])
+        category = escape(event.get('category', 'unit'))
+        if event['status'] == 'passed':
+            out.write(f"<div class='test-item test-passed'>✓ {library} ({category}) - {event['durationMs']}ms</div>\n")
+        elif event['status'] == 'skipped':
+            out.write(f"<div class='test-item test-skipped'>○ {library} ({category}) - 跳過</div>\n")
+        else:
+            out.write(f"<div class='test-item test-failed'>✗ {library} ({category}) - 失敗 ({event['durationMs']}ms)</div>\n")
+
+    total = summary['total']
+    categories = summary['categories']
+    out.write(f"""
+        <h2>📊 測試統計 Test Statistics</h2>
+        <div class="stats">
+            <div class="stat-box total">
+                <h3>{total}</h3>
+                <p>總測試數<br>Total Tests</p>
+            </div>
+            <div class="stat-box passed">
+                <h3>{summary['passed']}</h3>
+                <p>通過測試<br>Passed</p>
+            </div>
+            <div class="stat-box failed">
+                <h3>{summary['failed']}</h3>
+                <p>失敗測試<br>Failed</p>
+            </div>
+            <div class="stat-box skipped">
+                <h3>{summary['skipped']}</h3>
+                <p>跳過測試<br>Skipped</p>
+            </div>
+        </div>
+
+        <h2>📈 成功率 Success Rate</h2>
+        <div class="progress-bar">
+            <div class="progress-fill" style="width: {summary['successRate']}%"></div>
+        </div>
+        <p style="text-align: center; margin-top: 10px;">成功率 Success Rate: {summary['successRate']}%</p>
+
+        <h2>🏷️ 測試分類 Test Categories</h2>
+        <table>
+            <tr><th>測試類型 Test Type</th><th>數量 Count</th><th>比例 Percentage</th></tr>
+            <tr><td>單元測試 Unit Tests</td><td>{categories['unit']}</td><td>{_percent(categories['unit'], total)}%</td></tr>
+            <tr><td>集成測試 Integration Tests</td><td>{categories['integration']}</td><td>{_percent(categories['integration'], total)}%</td></tr>
+            <tr><td>性能測試 Performance Tests</td><td>{categories['performance']}</td><td>{_percent(categories['performance'], total)}%</td></tr>
+        </table>
+
+        <h2>⚡ 性能信息 Performance Info</h2>
+        <ul>
+            <li>總執行時間 Total Duration: {meta['totalDuration']}s</li>
+            <li>慢測試數量 Slow Tests: {summary['slow']}</li>
+            <li>性能閾值 Performance Threshold: {meta['threshold']}ms</li>
+            <li>警告數量 Warnings: {meta['warnings']}</li>
+            <li>錯誤數量 Errors: {summary['failed']}</li>
+        </ul>
+
+        <h2>📋 報告文件 Report Files</h2>
+        <ul>
+{''.join(f"            <li>{label}: <code>{escape(path)}</code></li>{chr(10)}" for label, path in meta['reports'].items() if path)}        </ul>
+    </div>
+</body>
+</html>
+""")
+
+
+def render_json(events_path: str, summary: Dict, meta: Dict, out: TextIO):
+    header = {
+        'timestamp': meta['timestamp'],
+        'version': '2.0',
+        'framework': 'Enhanced Wenyan Test Runner',
+        'summary': {
+            'total': summary['total'], 'passed': summary['passed'], 'failed': summary['failed'],
+            'skipped': summary['skipped'], 'warnings': meta['warnings'], 'errors': summary['failed'],
+            'successRate': summary['successRate'],
+        },
+        'performance': {'totalDuration': meta['totalDuration'], 'slowTests': summary['slow'],
+                        'threshold': meta['threshold']},
+        'categories': summary['categories'],
+        'reports': {key: path for key, path in meta['reportKeys'].items() if path},
+    }
+    # Leave testReport open so the test entries can be streamed in after the totals
+    text = json.dumps({'testReport': header}, ensure_ascii=False, indent=4).rstrip()
+    out.write(text[:-1].rstrip()[:-1].rstrip() + ',\n        "tests": [')
+    first = True
+    for event in read_events(events_path):
+        entry = {'file': event['file'], 'library': event['library'], 'category': event.get('category', 'unit'),
+                 'status': event['status'], 'exitCode': event['exitCode'], 'duration': event['durationMs'],
+                 'outputBytes': event.get('outputBytes', 0)}
+        out.write(('\n' if first else ',\n') + '            ' + json.dumps(entry, ensure_ascii=False))
+        first = False
+    out.write('\n        ]\n    }\n}\n')
+
+
+def render_junit(events_path: str, summary: Dict, meta: Dict, out: TextIO):
+    seconds = summary['testDurationMs'] / 1000
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f'<testsuites name="wenyan-stdlib" tests="{summary["total"]}" failures="{summary["failed"]}" '
+              f'skipped="{summary["skipped"]}" time="{seconds:.3f}">\n')
+    out.write(f'  <testsuite name="wenyan-stdlib" tests="{summary["total"]}" failures="{summary["failed"]}" '
+              f'errors="0" skipped="{summary["skipped"]}" time="{seconds:.3f}" timestamp={quoteattr(meta["timestamp"])}>\n')
+    for event in read_events(events_path):
+        name = quoteattr(event['file'])
+        classname = quoteattr(f"{event['library']}.{event.get('category', 'unit')}")
+        opening = f'    <testcase name={name} classname={classname} time="{event["durationMs"] / 1000:.3f}"'
+        if event['status'] == 'passed':
+            out.write(opening + '/>\n')
+        elif event['status'] == 'skipped':
+            out.write(opening + '>\n      <skipped message="no pass marker in output"/>\n    </testcase>\n')
+        else:
+            out.write(opening + f'>\n      <failure message="exit code {event["exitCode"]}" type="ExitCode"/>\n'
+                      f'    </testcase>\n')
+    out.write('  </testsuite>\n</testsuites>\n')
+
+
+def write_basic_log(events_path: str, out: TextIO):
+    """
+    One line per test for the plain-text log
+    """
+    labels = {'passed': '通過 PASSED', 'skipped': '跳過 SKIPPED', 'failed': '失敗 FAILED'}
+    for event in read_events(events_path):
+        out.write(f"{event['file']} [{event['library']}/{event.get('category', 'unit')}] "
+                  f"{labels.get(event['status'], event['status'])} {event['durationMs']}ms "
+                  f"(exit {event['exitCode']})\n")
+
+
+def output_formats(config_path: str = CONFIG_FILE):
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return set(config['buildConfig']['testing']['outputFormats'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return {'console', 'html', 'json', 'xml'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render test reports from a JSON-lines event log')
+    parser.add_argument('events', help='test_events_*.jsonl written by the runner')
+    parser.add_argument('--html', help='HTML report path')
+    parser.add_argument('--json', help='JSON report path')
+    parser.add_argument('--junit', help='JUnit XML report path')
+    parser.add_argument('--log', help='Append one line per test to this plain-text log')
+    parser.add_argument('--detailed-log', help='Detailed log path, listed in the reports')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD_MS, help='Slow-test threshold (ms)')
+    parser.add_argument('--started', type=float, default=None, help='Run start time (epoch seconds)')
+    parser.add_argument('--warnings', type=int, default=0, help='Warnings raised by the runner itself')
+    parser.add_argument('--config', default=CONFIG_FILE, help='Build configuration with testing.outputFormats')
+    parser.add_argument('--shell-summary', action='store_true', help='Print totals as shell assignments')
+
+    args = parser.parse_args()
+
+    summary = summarize(args.events, args.threshold)
+    warnings = args.warnings + summary['slow']
+    formats = output_formats(args.config)
+    html_path = args.html if 'html' in formats else None
+    json_path = args.json if 'json' in formats else None
+    junit_path = args.junit if 'xml' in formats else None
+    meta = {
+        'generated': time.strftime('%a %b %d %H:%M:%S %Z %Y'),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'totalDuration': int(time.time() - args.started) if args.started else summary['testDurationMs'] // 1000,
+        'threshold': args.threshold,
+        'warnings': warnings,
+        'reports': {'基本日誌 Basic Log': args.log, '詳細日誌 Detailed Log': args.detailed_log,
+                    'JSON報告 JSON Report': json_path, 'JUnit報告 JUnit Report': junit_path,
+                    '事件日誌 Event Log': args.events},
+        'reportKeys': {'basicLog': args.log, 'detailedLog': args.detailed_log, 'htmlReport': html_path,
+                       'junitReport': junit_path, 'eventLog': args.events},
+    }
+
+    for path, render in ((html_path, render_html), (json_path, render_json), (junit_path, render_junit)):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                render(args.events, summary, meta, f)
+    if args.log:
+        with open(args.log, 'a', encoding='utf-8') as f:
+            write_basic_log(args.events, f)
+
+    if args.shell_summary:
+        categories = summary['categories']
+        print(f"TOTAL_TESTS={summary['total']} PASSED_TESTS={summary['passed']} FAILED_TESTS={summary['failed']} "
+              f"SKIPPED_TESTS={summary['skipped']} SLOW_TESTS={summary['slow']} "
+              f"UNIT_TESTS={categories['unit']} INTEGRATION_TESTS={categories['integration']} "
+              f"PERFORMANCE_TESTS={categories['performance']} "
+              f"REPORT_FORMATS='{' '.join(sorted(formats))}'")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -31,6 +31,20 @@ LOG_FILE="test_results_${TIMESTAMP}.log"
 DETAILED_LOG="detailed_test_${TIMESTAMP}.log"
 SUMMARY_REPORT="test_summary_${TIMESTAMP}.html"
 JSON_REPORT="test_results_${TIMESTAMP}.json"
+JUNIT_REPORT="test_results_${TIMESTAMP}.xml"
+# 每個測試一行JSON事件，報告在運行結束時由 wenyan_test_reports.py 一次生成
+EVENT_LOG="test_events_${TIMESTAMP}.jsonl"
+
+# 調度配置：默認按CPU核心數並行，-j 1 為順序執行
+TEST_TIMEOUT=30
+PARALLEL_JOBS=$(nproc 2>/dev/null || getconf _NPROCESSORS_ONLN 2>/dev/null || echo 1)
+
+# 按變更選擇測試：git 引用或變更文件列表，留空則運行全部
+CHANGED_SINCE=""
+CHANGED_LIST=""
+
+# 構建產物庫（wenyan_artifact_store.py）：設置後直接用node運行已編譯的測試
+ARTIFACT_DIR=""
 
 # 性能統計
 START_TIME=$(date +%s)
@@ -66,98 +80,29 @@ log_to_all() {
 
 # 功能：初始化報告文件
 initialize_reports() {
-    # 清空日誌文件
+    # 清空日誌文件；HTML、JSON與JUnit報告在運行結束時由事件日誌生成
     > "$LOG_FILE"
     > "$DETAILED_LOG"
-    
-    # 初始化HTML報告
-    cat > "$SUMMARY_REPORT" << EOF
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>文言標準庫測試報告 - Wenyan Stdlib Test Report</title>
-    <style>
-        body { font-family: 'Microsoft YaHei', Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
-        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-        h1 { color: #2c3e50; text-align: center; border-bottom: 3px solid #3498db; padding-bottom: 10px; }
-        h2 { color: #34495e; border-left: 4px solid #3498db; padding-left: 10px; }
-        .stats { display: flex; justify-content: space-around; margin: 20px 0; }
-        .stat-box { text-align: center; padding: 15px; border-radius: 8px; min-width: 120px; }
-        .passed { background-color: #d4edda; color: #155724; }
-        .failed { background-color: #f8d7da; color: #721c24; }
-        .skipped { background-color: #fff3cd; color: #856404; }
-        .total { background-color: #d1ecf1; color: #0c5460; }
-        .test-item { margin: 10px 0; padding: 10px; border-radius: 5px; }
-        .test-passed { background-color: #d4edda; }
-        .test-failed { background-color: #f8d7da; }
-        .test-skipped { background-color: #fff3cd; }
-        .progress-bar { width: 100%; height: 20px; background-color: #e9ecef; border-radius: 10px; overflow: hidden; }
-        .progress-fill { height: 100%; background-color: #28a745; transition: width 0.3s ease; }
-        .timestamp { text-align: right; color: #6c757d; font-size: 0.9em; }
-        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-        th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
-        th { background-color: #f8f9fa; }
-        .warning { color: #856404; }
-        .error { color: #721c24; }
-        .success { color: #155724; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🧪 文言標準庫測試報告<br>Wenyan Standard Library Test Report</h1>
-        <div class="timestamp">生成時間 Generated: $(date)</div>
-EOF
-    
-    # 初始化JSON報告
-    cat > "$JSON_REPORT" << EOF
-{
-    "testReport": {
-        "timestamp": "$(date -Iseconds)",
-        "version": "2.0",
-        "framework": "Enhanced Wenyan Test Runner",
-        "summary": {
-            "total": 0,
-            "passed": 0,
-            "failed": 0,
-            "skipped": 0,
-            "warnings": 0,
-            "errors": 0
-        },
-        "performance": {
-            "totalDuration": 0,
-            "slowTests": 0,
-            "threshold": $PERFORMANCE_THRESHOLD_MS
-        },
-        "categories": {
-            "unit": 0,
-            "integration": 0,
-            "performance": 0
-        },
-        "tests": []
-    }
-}
-EOF
+    > "$EVENT_LOG"
 }
 
-# 功能：檢查測試文件類型
+# 功能：檢查測試文件類型（僅無python3時使用），結果存入 TEST_CATEGORY
+# 不在子shell中調用，分類計數才能保留
 classify_test() {
     local test_file="$1"
-    local test_content=$(cat "$test_file" 2>/dev/null || echo "")
-    
-    if echo "$test_content" | grep -q "單元測試\|unit.*test"; then
+
+    if grep -q "單元測試\|unit.*test" "$test_file" 2>/dev/null; then
         ((UNIT_TESTS++))
-        echo "unit"
-    elif echo "$test_content" | grep -q "集成測試\|integration.*test"; then
+        TEST_CATEGORY="unit"
+    elif grep -q "集成測試\|integration.*test" "$test_file" 2>/dev/null; then
         ((INTEGRATION_TESTS++))
-        echo "integration"
-    elif echo "$test_content" | grep -q "性能測試\|performance.*test"; then
+        TEST_CATEGORY="integration"
+    elif grep -q "性能測試\|performance.*test" "$test_file" 2>/dev/null; then
         ((PERFORMANCE_TESTS++))
-        echo "performance"
+        TEST_CATEGORY="performance"
     else
         ((UNIT_TESTS++))  # 默認為單元測試
-        echo "unit"
+        TEST_CATEGORY="unit"
     fi
 }
 
@@ -179,48 +124,85 @@ check_wenyan() {
 run_test_file() {
     local test_file="$1"
     local lib_name="$2"
-    local test_category=$(classify_test "$test_file")
-    
+
     print_color $BLUE "運行測試：$test_file"
     print_color $BLUE "Running test: $test_file"
-    log_to_all "=========================================="
-    log_to_all "測試文件: $test_file"
-    log_to_all "庫名稱: $lib_name"
-    log_to_all "測試類型: $test_category"
-    log_to_all "開始時間: $(date)"
-    
+
     # 記錄測試開始時間
     local test_start=$(date +%s%3N)
-    
+
     # 創建臨時目錄用於測試
     local temp_dir=$(mktemp -d)
     local test_output="$temp_dir/test_output.log"
     local test_error="$temp_dir/test_error.log"
-    
-    # 運行測試並捕獲輸出
+
+    # 運行測試並捕獲輸出；產物庫中已有編譯結果時不再重新編譯
+    # 此運行器不逐個修復JavaScript：修復版由 wenyan_artifact_store.py 在同一進程內生成，
+    # 逐個修復的流程見 fixed_test_runner.sh（經 wenyan_js_fixer_service.py 常駐服務）
     local test_result=0
-    if timeout 30s wenyan "$test_file" > "$test_output" 2> "$test_error"; then
+    if [ -n "$ARTIFACT_DIR" ] && [ -f "$ARTIFACT_DIR/$test_file.err" ]; then
+        : > "$test_output"
+        cp "$ARTIFACT_DIR/$test_file.err" "$test_error"
+        test_result=1
+    elif [ -n "$ARTIFACT_DIR" ] && [ -f "$ARTIFACT_DIR/$test_file.js" ]; then
+        if timeout "${TEST_TIMEOUT}s" node "$ARTIFACT_DIR/$test_file.js" > "$test_output" 2> "$test_error" < /dev/null; then
+            test_result=0
+        else
+            test_result=$?
+        fi
+    elif timeout "${TEST_TIMEOUT}s" wenyan "$test_file" > "$test_output" 2> "$test_error" < /dev/null; then
         test_result=0
     else
         test_result=$?
     fi
-    
+
     # 計算執行時間
     local test_end=$(date +%s%3N)
     local duration=$((test_end - test_start))
-    
+
+    record_test_result "$test_file" "$lib_name" "$test_result" "$duration" "$test_output" "$test_error"
+
+    # 清理臨時文件
+    rm -rf "$temp_dir"
+}
+
+# 功能：JSON字符串轉義
+json_escape() {
+    local value="$1"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    printf '%s' "$value"
+}
+
+# 功能：記錄單個測試結果（無python3時的順序模式）
+record_test_result() {
+    local test_file="$1"
+    local lib_name="$2"
+    local test_result="$3"
+    local duration="$4"
+    local test_output="$5"
+    local test_error="$6"
+    local test_status=""
+    classify_test "$test_file"
+    local test_category="$TEST_CATEGORY"
+
+    log_to_all "=========================================="
+    log_to_all "測試文件: $test_file"
+    log_to_all "庫名稱: $lib_name"
+    log_to_all "測試類型: $test_category"
+
     # 檢查是否為慢測試
     if [ $duration -gt $PERFORMANCE_THRESHOLD_MS ]; then
         ((SLOW_TESTS++))
-        print_color $YELLOW "⚠️  慢測試警告：執行時間 ${duration}ms 超過閾值 ${PERFORMANCE_THRESHOLD_MS}ms"
-        print_color $YELLOW "⚠️  Slow test warning: ${duration}ms exceeds threshold ${PERFORMANCE_THRESHOLD_MS}ms"
+        print_color $YELLOW "⚠️  慢測試警告：$test_file 執行時間 ${duration}ms 超過閾值 ${PERFORMANCE_THRESHOLD_MS}ms"
+        print_color $YELLOW "⚠️  Slow test warning: $test_file ${duration}ms exceeds threshold ${PERFORMANCE_THRESHOLD_MS}ms"
         ((WARNING_COUNT++))
     fi
-    
+
     # 分析測試結果
     local test_output_content=$(cat "$test_output" 2>/dev/null || echo "")
     local test_error_content=$(cat "$test_error" 2>/dev/null || echo "")
-    
+
     # 記錄詳細日誌
     {
         echo "測試輸出 Test Output:"
@@ -233,7 +215,7 @@ run_test_file() {
         echo "退出代碼 Exit Code: $test_result"
         echo "=========================================="
     } >> "$DETAILED_LOG"
-    
+
     # 判定測試結果
     if [ $test_result -eq 0 ]; then
         if echo "$test_output_content" | grep -q "測試全部通過\|All Tests PASSED\|🎉"; then
@@ -241,16 +223,13 @@ run_test_file() {
             print_color $GREEN "✓ PASSED: $lib_name (${duration}ms)"
             log_to_all "結果: 通過 PASSED"
             ((PASSED_TESTS++))
-            
-            # 添加到HTML報告
-            echo "<div class='test-item test-passed'>✓ $lib_name ($test_category) - ${duration}ms</div>" >> "$SUMMARY_REPORT"
+            test_status="passed"
         else
             print_color $YELLOW "○ 跳過：$lib_name (無明確測試結果)"
             print_color $YELLOW "○ SKIPPED: $lib_name (No clear test result)"
             log_to_all "結果: 跳過 SKIPPED"
             ((SKIPPED_TESTS++))
-            
-            echo "<div class='test-item test-skipped'>○ $lib_name ($test_category) - 跳過</div>" >> "$SUMMARY_REPORT"
+            test_status="skipped"
         fi
     else
         print_color $RED "✗ 失敗：$lib_name (退出代碼: $test_result, ${duration}ms)"
@@ -258,27 +237,25 @@ run_test_file() {
         log_to_all "結果: 失敗 FAILED"
         ((FAILED_TESTS++))
         ((ERROR_COUNT++))
-        
+        test_status="failed"
+
         # 記錄失敗詳情
         log_to_all "失敗詳情 Failure Details:"
         log_to_all "$test_error_content"
-        
-        echo "<div class='test-item test-failed'>✗ $lib_name ($test_category) - 失敗 (${duration}ms)</div>" >> "$SUMMARY_REPORT"
     fi
-    
+
+    # 與調度器相同格式的測試事件
+    printf '{"file": "%s", "library": "%s", "category": "%s", "status": "%s", "exitCode": %d, "durationMs": %d, "outputBytes": %d}\n' \
+        "$(json_escape "$test_file")" "$(json_escape "$lib_name")" "$test_category" "$test_status" \
+        "$test_result" "$duration" "$(wc -c < "$test_output")" >> "$EVENT_LOG"
+
     ((TOTAL_TESTS++))
-    log_to_all "結束時間: $(date)"
     log_to_all ""
-    
-    # 清理臨時文件
-    rm -rf "$temp_dir"
 }
 
-# 功能：掃描並運行所有測試
-run_all_tests() {
-    log_to_all "開始運行測試..."
-    log_to_all "Starting test execution..."
-    log_to_all ""
+# 功能：收集所有測試文件，每行為「文件<TAB>庫名」
+collect_tests() {
+    local list_file="$1"
 
     # 檢查測試目錄是否存在
     if [ ! -d "$TESTS_DIR" ]; then
@@ -294,7 +271,7 @@ run_all_tests() {
             print_color $CYAN "檢查庫：$lib_name"
             print_color $CYAN "Checking library: $lib_name"
             log_to_all "檢查庫: $lib_name"
-            
+
             # 查找測試文件 - 使用更安全的方法
             local found_tests=false
             # 檢查是否存在.wy文件
@@ -302,11 +279,11 @@ run_all_tests() {
                 for test_file in "$lib_dir"/*.wy; do
                     if [ -f "$test_file" ]; then
                         found_tests=true
-                        run_test_file "$test_file" "$lib_name"
+                        printf '%s\t%s\n' "$test_file" "$lib_name" >> "$list_file"
                     fi
                 done
             fi
-            
+
             if [ "$found_tests" = false ]; then
                 print_color $YELLOW "⚠️  警告：庫 $lib_name 沒有找到測試文件（這是正常的，不影響構建）"
                 print_color $YELLOW "⚠️  Warning: No test files found for library $lib_name (this is normal and doesn't affect build)"
@@ -316,7 +293,7 @@ run_all_tests() {
         fi
     done
 
-    # 運行根目錄的測試文件
+    # 收集根目錄的測試文件
     print_color $CYAN "檢查根目錄測試文件..."
     print_color $CYAN "Checking root directory test files..."
     log_to_all "檢查根目錄測試文件..."
@@ -325,17 +302,106 @@ run_all_tests() {
     if ls *.wy 1> /dev/null 2>&1; then
         for test_file in *.wy; do
             if [ -f "$test_file" ] && [[ "$test_file" == 測試* || "$test_file" == *test* ]]; then
-                run_test_file "$test_file" "根目錄測試"
+                printf '%s\t%s\n' "$test_file" "根目錄測試" >> "$list_file"
             fi
         done
     fi
 }
 
+# 功能：只保留受變更影響的測試（依據引用依賴圖）
+select_changed_tests() {
+    local list_file="$1"
+    local selected_file=$(mktemp)
+    local total_count=$(wc -l < "$list_file")
+    local select_args=()
+
+    [ -n "$CHANGED_SINCE" ] && select_args+=(--since "$CHANGED_SINCE")
+    [ -n "$CHANGED_LIST" ] && select_args+=(--changed-list "$CHANGED_LIST")
+
+    if python3 wenyan_dependency_graph.py select "${select_args[@]}" < "$list_file" > "$selected_file"; then
+        mv "$selected_file" "$list_file"
+        local selected_count=$(wc -l < "$list_file")
+        print_color $CYAN "🎯 按變更選擇測試：$selected_count / $total_count"
+        print_color $CYAN "🎯 Change-based selection: $selected_count of $total_count tests"
+        log_to_all "按變更選擇 Change-based selection: $selected_count / $total_count"
+    else
+        rm -f "$selected_file"
+        print_color $YELLOW "⚠️  無法計算受影響的測試，運行全部測試"
+        print_color $YELLOW "⚠️  Could not compute affected tests, running all tests"
+        ((WARNING_COUNT++))
+    fi
+}
+
+# 功能：經調度器運行測試，按歷史耗時最長優先；每個測試完成即寫入事件日誌
+run_tests_scheduled() {
+    local list_file="$1"
+    local results_dir=$(mktemp -d)
+
+    print_color $CYAN "⚡ 運行測試：$PARALLEL_JOBS 個工作進程"
+    print_color $CYAN "⚡ Running tests: $PARALLEL_JOBS workers"
+    log_to_all "並行工作數 Parallel workers: $PARALLEL_JOBS"
+
+    local scheduler_args=(--jobs "$PARALLEL_JOBS" --timeout "$TEST_TIMEOUT" --results-dir "$results_dir"
+        --events "$EVENT_LOG" --detailed-log "$DETAILED_LOG" --threshold "$PERFORMANCE_THRESHOLD_MS")
+    [ -n "$ARTIFACT_DIR" ] && scheduler_args+=(--artifacts "$ARTIFACT_DIR")
+
+    python3 parallel_test_scheduler.py "${scheduler_args[@]}" < "$list_file"
+
+    rm -rf "$results_dir"
+}
+
+# 功能：掃描並運行所有測試
+run_all_tests() {
+    log_to_all "開始運行測試..."
+    log_to_all "Starting test execution..."
+    log_to_all ""
+
+    local list_file=$(mktemp)
+    collect_tests "$list_file"
+
+    if [ -n "$CHANGED_SINCE" ] || [ -n "$CHANGED_LIST" ]; then
+        select_changed_tests "$list_file"
+    fi
+
+    # 有python3時總經調度器運行（-j 1 即順序），每個測試不再派生分類與報告進程
+    if command -v python3 &> /dev/null; then
+        run_tests_scheduled "$list_file"
+    else
+        local test_file lib_name
+        while IFS=$'\t' read -r -u 3 test_file lib_name; do
+            run_test_file "$test_file" "$lib_name"
+        done 3< "$list_file"
+    fi
+
+    rm -f "$list_file"
+}
+
 # 功能：生成最終報告
 generate_final_report() {
     local end_time=$(date +%s)
     local total_duration=$((end_time - START_TIME))
-    
+    local report_formats="console"
+
+    # 從事件日誌一次生成HTML、JSON與JUnit報告，並取回統計數字
+    if command -v python3 &> /dev/null; then
+        local summary
+        if summary=$(python3 wenyan_test_reports.py "$EVENT_LOG" --html "$SUMMARY_REPORT" --json "$JSON_REPORT" \
+                --junit "$JUNIT_REPORT" --log "$LOG_FILE" --detailed-log "$DETAILED_LOG" \
+                --threshold "$PERFORMANCE_THRESHOLD_MS" --started "$START_TIME" --warnings "$WARNING_COUNT" \
+                --shell-summary); then
+            eval "$summary"
+            report_formats="$REPORT_FORMATS"
+            WARNING_COUNT=$((WARNING_COUNT + SLOW_TESTS))
+            ERROR_COUNT=$FAILED_TESTS
+        else
+            print_color $RED "❌ 無法從事件日誌生成報告 Could not render reports from $EVENT_LOG"
+            FAILED_TESTS=$((FAILED_TESTS > 0 ? FAILED_TESTS : 1))
+        fi
+    else
+        print_color $YELLOW "⚠️  未找到python3，只生成控制台摘要與事件日誌"
+        print_color $YELLOW "⚠️  python3 not found, only the console summary and event log are written"
+    fi
+
     print_color $PURPLE "=========================================="
     print_color $PURPLE "測試結果摘要 - Test Results Summary"
     print_color $PURPLE "=========================================="
@@ -364,104 +430,10 @@ generate_final_report() {
     echo "" | tee -a "$LOG_FILE"
 
     # 計算成功率
-    local success_rate=0
     if [ $TOTAL_TESTS -gt 0 ]; then
-        success_rate=$((PASSED_TESTS * 100 / TOTAL_TESTS))
-        echo "成功率 Success Rate: ${success_rate}%" | tee -a "$LOG_FILE"
+        echo "成功率 Success Rate: $((PASSED_TESTS * 100 / TOTAL_TESTS))%" | tee -a "$LOG_FILE"
     fi
 
-    # 完善HTML報告
-    cat >> "$SUMMARY_REPORT" << EOF
-        
-        <h2>📊 測試統計 Test Statistics</h2>
-        <div class="stats">
-            <div class="stat-box total">
-                <h3>$TOTAL_TESTS</h3>
-                <p>總測試數<br>Total Tests</p>
-            </div>
-            <div class="stat-box passed">
-                <h3>$PASSED_TESTS</h3>
-                <p>通過測試<br>Passed</p>
-            </div>
-            <div class="stat-box failed">
-                <h3>$FAILED_TESTS</h3>
-                <p>失敗測試<br>Failed</p>
-            </div>
-            <div class="stat-box skipped">
-                <h3>$SKIPPED_TESTS</h3>
-                <p>跳過測試<br>Skipped</p>
-            </div>
-        </div>
-        
-        <h2>📈 成功率 Success Rate</h2>
-        <div class="progress-bar">
-            <div class="progress-fill" style="width: ${success_rate}%"></div>
-        </div>
-        <p style="text-align: center; margin-top: 10px;">成功率 Success Rate: ${success_rate}%</p>
-        
-        <h2>🏷️ 測試分類 Test Categories</h2>
-        <table>
-            <tr><th>測試類型 Test Type</th><th>數量 Count</th><th>比例 Percentage</th></tr>
-            <tr><td>單元測試 Unit Tests</td><td>$UNIT_TESTS</td><td>$((UNIT_TESTS * 100 / (TOTAL_TESTS > 0 ? TOTAL_TESTS : 1)))%</td></tr>
-            <tr><td>集成測試 Integration Tests</td><td>$INTEGRATION_TESTS</td><td>$((INTEGRATION_TESTS * 100 / (TOTAL_TESTS > 0 ? TOTAL_TESTS : 1)))%</td></tr>
-            <tr><td>性能測試 Performance Tests</td><td>$PERFORMANCE_TESTS</td><td>$((PERFORMANCE_TESTS * 100 / (TOTAL_TESTS > 0 ? TOTAL_TESTS : 1)))%</td></tr>
-        </table>
-        
-        <h2>⚡ 性能信息 Performance Info</h2>
-        <ul>
-            <li>總執行時間 Total Duration: ${total_duration}s</li>
-            <li>慢測試數量 Slow Tests: $SLOW_TESTS</li>
-            <li>性能閾值 Performance Threshold: ${PERFORMANCE_THRESHOLD_MS}ms</li>
-            <li>警告數量 Warnings: $WARNING_COUNT</li>
-            <li>錯誤數量 Errors: $ERROR_COUNT</li>
-        </ul>
-        
-        <h2>📋 報告文件 Report Files</h2>
-        <ul>
-            <li>基本日誌 Basic Log: <code>$LOG_FILE</code></li>
-            <li>詳細日誌 Detailed Log: <code>$DETAILED_LOG</code></li>
-            <li>JSON報告 JSON Report: <code>$JSON_REPORT</code></li>
-        </ul>
-    </div>
-</body>
-</html>
-EOF
-
-    # 更新JSON報告
-    cat > "$JSON_REPORT" << EOF
-{
-    "testReport": {
-        "timestamp": "$(date -Iseconds)",
-        "version": "2.0",
-        "framework": "Enhanced Wenyan Test Runner",
-        "summary": {
-            "total": $TOTAL_TESTS,
-            "passed": $PASSED_TESTS,
-            "failed": $FAILED_TESTS,
-            "skipped": $SKIPPED_TESTS,
-            "warnings": $WARNING_COUNT,
-            "errors": $ERROR_COUNT,
-            "successRate": $success_rate
-        },
-        "performance": {
-            "totalDuration": $total_duration,
-            "slowTests": $SLOW_TESTS,
-            "threshold": $PERFORMANCE_THRESHOLD_MS
-        },
-        "categories": {
-            "unit": $UNIT_TESTS,
-            "integration": $INTEGRATION_TESTS,
-            "performance": $PERFORMANCE_TESTS
-        },
-        "reports": {
-            "basicLog": "$LOG_FILE",
-            "detailedLog": "$DETAILED_LOG",
-            "htmlReport": "$SUMMARY_REPORT"
-        }
-    }
-}
-EOF
-
     echo "" | tee -a "$LOG_FILE"
 
     # 最終判定和建議
@@ -473,22 +445,21 @@ EOF
             print_color $YELLOW "⚠️  Note: $WARNING_COUNT warnings found (does not affect build success)"
             log_to_all "警告不影響構建 - 這些通常是缺失測試文件的提醒"
         fi
-        print_color $CYAN "📋 報告文件已生成 Reports generated:"
-        print_color $CYAN "  - 基本日誌 Basic log: $LOG_FILE"
-        print_color $CYAN "  - 詳細日誌 Detailed log: $DETAILED_LOG"
-        print_color $CYAN "  - HTML報告 HTML report: $SUMMARY_REPORT"
-        print_color $CYAN "  - JSON報告 JSON report: $JSON_REPORT"
-        exit 0
     else
         print_color $RED "❌ 有 $FAILED_TESTS 個測試失敗！$FAILED_TESTS tests failed!"
         log_to_all "❌ 有 $FAILED_TESTS 個測試失敗！$FAILED_TESTS tests failed!"
-        print_color $CYAN "📋 報告文件已生成 Reports generated:"
-        print_color $CYAN "  - 基本日誌 Basic log: $LOG_FILE"
-        print_color $CYAN "  - 詳細日誌 Detailed log: $DETAILED_LOG"
-        print_color $CYAN "  - HTML報告 HTML report: $SUMMARY_REPORT"
-        print_color $CYAN "  - JSON報告 JSON report: $JSON_REPORT"
-        exit 1
     fi
+
+    print_color $CYAN "📋 報告文件已生成 Reports generated:"
+    print_color $CYAN "  - 基本日誌 Basic log: $LOG_FILE"
+    print_color $CYAN "  - 詳細日誌 Detailed log: $DETAILED_LOG"
+    print_color $CYAN "  - 事件日誌 Event log: $EVENT_LOG"
+    [[ " $report_formats " == *" html "* ]] && print_color $CYAN "  - HTML報告 HTML report: $SUMMARY_REPORT"
+    [[ " $report_formats " == *" json "* ]] && print_color $CYAN "  - JSON報告 JSON report: $JSON_REPORT"
+    [[ " $report_formats " == *" xml "* ]] && print_color $CYAN "  - JUnit報告 JUnit report: $JUNIT_REPORT"
+
+    [ $FAILED_TESTS -eq 0 ] && exit 0
+    exit 1
 }
 
 # 功能：顯示幫助信息
@@ -503,18 +474,26 @@ show_help() {
     echo "  -v, --verbose           詳細輸出模式 Verbose output mode"
     echo "  -t, --threshold <ms>    設置性能閾值(毫秒) Set performance threshold (ms)"
     echo "  --no-color              禁用顏色輸出 Disable colored output"
-    echo "  --timeout <seconds>     設置測試超時時間 Set test timeout"
+    echo "  --timeout <seconds>     設置測試超時時間 Set test timeout (default: 30)"
+    echo "  -j, --jobs <n>          並行測試數，1為順序執行 Parallel tests, 1 = sequential (default: CPU count)"
+    echo "  --changed <ref>         只運行受自 <ref> 以來變更影響的測試 Only tests affected by changes since a git ref"
+    echo "  --changed-list <file>   只運行受列表中文件影響的測試 Only tests affected by the files listed"
+    echo "  --artifacts <dir>       運行產物庫中已編譯的測試 Run tests compiled into an artifact store"
     echo ""
     echo "示例 Examples:"
     echo "  $0                      運行所有測試 Run all tests"
     echo "  $0 -v                   運行所有測試（詳細模式） Run all tests (verbose)"
     echo "  $0 -t 2000              設置2秒性能閾值 Set 2s performance threshold"
+    echo "  $0 -j 1                 順序運行所有測試 Run all tests sequentially"
+    echo "  $0 --changed origin/main 只運行受影響的測試 Run only tests affected by the branch"
     echo ""
     echo "生成的文件 Generated Files:"
     echo "  - test_results_*.log    基本測試日誌 Basic test log"
     echo "  - detailed_test_*.log   詳細測試日誌 Detailed test log"
     echo "  - test_summary_*.html   HTML測試報告 HTML test report"
     echo "  - test_results_*.json   JSON測試報告 JSON test report"
+    echo "  - test_results_*.xml    JUnit XML測試報告 JUnit XML test report"
+    echo "  - test_events_*.jsonl   每個測試一行的事件日誌 One JSON event per test"
     echo ""
 }
 
@@ -544,7 +523,23 @@ while [[ $# -gt 0 ]]; do
             shift
             ;;
         --timeout)
-            # 這裡可以設置timeout值，當前在run_test_file中hardcode為30s
+            TEST_TIMEOUT="$2"
+            shift 2
+            ;;
+        -j|--jobs)
+            PARALLEL_JOBS="$2"
+            shift 2
+            ;;
+        --changed)
+            CHANGED_SINCE="$2"
+            shift 2
+            ;;
+        --changed-list)
+            CHANGED_LIST="$2"
+            shift 2
+            ;;
+        --artifacts)
+            ARTIFACT_DIR="$2"
             shift 2
             ;;
         *)
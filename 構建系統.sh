@@ -26,6 +26,15 @@ LIBS_DIR="libs"
 TESTS_DIR="tests"
 EXAMPLES_DIR="examples"
 
+# 構建產物庫：每個源文件每次構建只編譯一次，驗證、測試和打包都從這裡讀取
+ARTIFACT_DIR="$BUILD_DIR/artifacts"
+USE_ARTIFACTS=false
+
+# 編譯緩存（設置見 build.config.json 的 caching 部分）
+COMPILE_CACHE=true
+CACHE_HITS=0
+CACHE_MISSES=0
+
 # 構建統計
 TOTAL_LIBS=0
 SUCCESSFUL_BUILDS=0
@@ -70,8 +79,8 @@ init_build_env() {
     mkdir -p "$DIST_DIR"
     mkdir -p "$DOCS_DIR"
     
-    # 清理之前的構建
-    rm -rf "$BUILD_DIR"/*
+    # 清理之前的構建（保留產物庫，未改變的文件無需重新編譯）
+    find "$BUILD_DIR" -mindepth 1 -maxdepth 1 ! -path "$ARTIFACT_DIR" -exec rm -rf {} +
     rm -rf "$DIST_DIR"/*
     rm -rf "$DOCS_DIR"/*
     
@@ -82,6 +91,13 @@ init_build_env() {
         exit 1
     fi
     
+    # 編譯器版本是緩存鍵的一部分，只查詢一次
+    export WENYAN_COMPILER_VERSION=$(wenyan --version 2>/dev/null || echo "unknown")
+    if [ "$COMPILE_CACHE" = true ] && ! command -v python3 &> /dev/null; then
+        print_color $YELLOW "⚠️  未找到python3，停用編譯緩存 python3 not found, compile cache disabled"
+        COMPILE_CACHE=false
+    fi
+    
     # 檢查必要目錄
     if [ ! -d "$LIBS_DIR" ]; then
         print_color $RED "❌ 錯誤：找不到庫目錄 $LIBS_DIR"
@@ -94,6 +110,54 @@ init_build_env() {
     echo ""
 }
 
+# 功能：從編譯緩存恢復（命中返回0）
+cache_lookup() {
+    local file_path="$1"
+    local js_output="${2:-}"
+    
+    [ "$COMPILE_CACHE" = true ] || return 1
+    if [ -n "$js_output" ]; then
+        python3 wenyan_compile_cache.py lookup "$file_path" --output "$js_output" 2>/dev/null
+    else
+        python3 wenyan_compile_cache.py lookup "$file_path" 2>/dev/null
+    fi
+}
+
+# 功能：記錄編譯結果到緩存
+cache_store() {
+    local file_path="$1"
+    local js_output="$2"
+    
+    [ "$COMPILE_CACHE" = true ] || return 0
+    python3 wenyan_compile_cache.py store "$file_path" "$js_output" 2>/dev/null || true
+}
+
+# 功能：編譯階段，把所有源文件編譯進產物庫
+compile_artifacts() {
+    print_color $PURPLE "⚙️  編譯階段 Compile stage: $ARTIFACT_DIR"
+    print_color $PURPLE "=========================================="
+    
+    if ! command -v python3 &> /dev/null; then
+        print_color $YELLOW "⚠️  未找到python3，各階段將自行編譯 python3 not found, phases compile on their own"
+        echo ""
+        return 0
+    fi
+    
+    local store_args=(compile --jobs "$(nproc 2>/dev/null || echo 1)")
+    [ "$COMPILE_CACHE" = true ] || store_args+=(--no-cache)
+    
+    # 失敗的文件會記錄在產物庫中，由驗證階段報告
+    local summary=$(python3 wenyan_artifact_store.py --store "$ARTIFACT_DIR" "${store_args[@]}" 2>/dev/null | tail -1)
+    if [ -f "$ARTIFACT_DIR/manifest.json" ]; then
+        USE_ARTIFACTS=true
+        print_color $GREEN "✅ $summary"
+        log_message "編譯階段 Compile stage: $summary"
+    else
+        print_color $YELLOW "⚠️  產物庫不可用，各階段將自行編譯 Artifact store unavailable, phases compile on their own"
+    fi
+    echo ""
+}
+
 # 功能：驗證單個文件
 validate_file() {
     local file_path="$1"
@@ -101,11 +165,37 @@ validate_file() {
     
     print_color $BLUE "🔍 驗證文件 Validating: $file_name"
     
-    # 語法檢查
-    if wenyan -c "$file_path" &> /dev/null; then
+    # 編譯階段已產生結果時直接讀取
+    if [ "$USE_ARTIFACTS" = true ]; then
+        local artifact="$ARTIFACT_DIR/${file_path#./}"
+        if [ -f "$artifact.js" ]; then
+            print_color $GREEN "  ✅ 語法檢查通過 Syntax validation passed"
+            return 0
+        elif [ -f "$artifact.err" ]; then
+            print_color $RED "  ❌ 語法檢查失敗 Syntax validation failed"
+            log_message "語法錯誤 Syntax error in: $file_path"
+            log_message "$(head -5 "$artifact.err")"
+            return 1
+        fi
+    fi
+    
+    # 源文件及其引用均未改變時，緩存中的編譯結果即為通過
+    if cache_lookup "$file_path"; then
+        ((CACHE_HITS++))
+        print_color $GREEN "  ♻️  編譯緩存命中 Compile cache hit"
+        return 0
+    fi
+    ((CACHE_MISSES++))
+    
+    # 語法檢查，順便保存編譯結果供 compile_file 使用
+    local js_temp=$(mktemp)
+    if wenyan -c "$file_path" > "$js_temp" 2> /dev/null; then
+        cache_store "$file_path" "$js_temp"
+        rm -f "$js_temp"
         print_color $GREEN "  ✅ 語法檢查通過 Syntax validation passed"
         return 0
     else
+        rm -f "$js_temp"
         print_color $RED "  ❌ 語法檢查失敗 Syntax validation failed"
         log_message "語法錯誤 Syntax error in: $file_path"
         return 1
@@ -125,7 +215,20 @@ compile_file() {
     
     # 編譯為JavaScript
     local js_output="$output_dir/${file_name%.wy}.js"
+    local artifact="$ARTIFACT_DIR/${file_path#./}.js"
+    if [ "$USE_ARTIFACTS" = true ] && [ -f "$artifact" ]; then
+        cp "$artifact" "$js_output"
+        print_color $GREEN "  ✅ 編譯成功 Compilation successful: $js_output"
+        log_message "編譯成功 Compiled successfully: $file_path -> $js_output"
+        return 0
+    fi
+    if cache_lookup "$file_path" "$js_output"; then
+        print_color $GREEN "  ♻️  從緩存恢復 Restored from cache: $js_output"
+        log_message "緩存恢復 Restored from cache: $file_path -> $js_output"
+        return 0
+    fi
     if wenyan -c "$file_path" -o "$js_output" 2>/dev/null; then
+        cache_store "$file_path" "$js_output"
         print_color $GREEN "  ✅ 編譯成功 Compilation successful: $js_output"
         log_message "編譯成功 Compiled successfully: $file_path -> $js_output"
         return 0
@@ -265,6 +368,18 @@ build_all_libraries() {
     log_message "所有庫構建完成 All library builds completed"
 }
 
+# 功能：清理過期的編譯緩存
+evict_compile_cache() {
+    [ "$COMPILE_CACHE" = true ] || return 0
+    
+    print_color $BLUE "♻️  編譯緩存 Compile cache: $CACHE_HITS 命中 hits, $CACHE_MISSES 未命中 misses"
+    log_message "編譯緩存 Compile cache: $CACHE_HITS hits, $CACHE_MISSES misses"
+    python3 wenyan_compile_cache.py evict 2>/dev/null | while read -r line; do
+        log_message "$line"
+    done
+    echo ""
+}
+
 # 功能：驗證基礎設施文件
 validate_infrastructure_files() {
     print_color $PURPLE "🔍 驗證基礎設施文件 Validating infrastructure files..."
@@ -322,8 +437,10 @@ run_tests() {
     print_color $PURPLE "======================================"
     
     if [ -f "./增強測試運行器.sh" ]; then
-        # 運行增強測試運行器
-        if ./增強測試運行器.sh; then
+        # 運行增強測試運行器，測試直接執行產物庫中的JavaScript
+        local runner_args=()
+        [ "$USE_ARTIFACTS" = true ] && runner_args+=(--artifacts "$ARTIFACT_DIR")
+        if ./增強測試運行器.sh "${runner_args[@]}"; then
             print_color $GREEN "✅ 測試套件通過 Test suite passed"
             log_message "測試套件通過 Test suite passed"
         else
@@ -458,8 +575,11 @@ create_release_archive() {
     
     mkdir -p "$release_dir"
     
-    # 復制所有構建產物
-    cp -r "$BUILD_DIR"/* "$release_dir/" 2>/dev/null || true
+    # 復制所有構建產物（產物庫只是中間結果，不隨發布）
+    for build_entry in "$BUILD_DIR"/*; do
+        [ "$build_entry" = "$ARTIFACT_DIR" ] && continue
+        cp -r "$build_entry" "$release_dir/" 2>/dev/null || true
+    done
     cp -r "$DOCS_DIR"/* "$release_dir/docs/" 2>/dev/null || mkdir -p "$release_dir/docs"
     
     # 復制重要文件
@@ -576,6 +696,7 @@ cleanup_build() {
         print_color $YELLOW "🧹 執行完整清理 Performing full cleanup..."
         rm -rf "$BUILD_DIR" "$DIST_DIR" "$DOCS_DIR"
         rm -f build_*.log
+        python3 wenyan_compile_cache.py clear 2>/dev/null || true
         print_color $GREEN "✅ 完整清理完成 Full cleanup completed"
     else
         print_color $YELLOW "🧹 執行標準清理 Performing standard cleanup..."
@@ -597,7 +718,8 @@ show_help() {
     echo "  -t, --test-only         僅運行測試 Run tests only"
     echo "  -d, --docs-only         僅生成文檔 Generate documentation only"
     echo "  -c, --clean             清理構建文件 Clean build files"
-    echo "  --full-clean            完整清理所有文件 Full cleanup of all files"
+    echo "  --full-clean            完整清理所有文件（含編譯緩存） Full cleanup of all files (incl. compile cache)"
+    echo "  --no-cache              不使用編譯緩存 Do not use the compile cache"
     echo "  -v, --verbose           詳細輸出模式 Verbose output mode"
     echo "  --no-color              禁用顏色輸出 Disable colored output"
     echo ""
@@ -610,9 +732,11 @@ show_help() {
     echo ""
     echo "構建產物 Build Artifacts:"
     echo "  - build/                編譯後的文件 Compiled files"
+    echo "  - build/artifacts/      產物庫（每個源文件的JS及修復後JS） Artifact store (JS and fixed JS per source)"
     echo "  - dist/                 發布包 Distribution packages"
     echo "  - docs/generated/       生成的文檔 Generated documentation"
     echo "  - build_*.log           構建日誌 Build logs"
+    echo "  - .cache/compile/       編譯緩存 Compile cache"
     echo ""
 }
 
@@ -655,6 +779,10 @@ main() {
                 full_clean=true
                 shift
                 ;;
+            --no-cache)
+                COMPILE_CACHE=false
+                shift
+                ;;
             -v|--verbose)
                 verbose=true
                 set -x
@@ -692,20 +820,25 @@ main() {
     show_banner
     
     if [ "$test_only" = true ]; then
+        compile_artifacts
         run_tests
     elif [ "$docs_only" = true ]; then
         init_build_env
         generate_documentation
     elif [ "$build_only" = true ]; then
         init_build_env
+        compile_artifacts
         build_all_libraries
         validate_infrastructure_files
+        evict_compile_cache
         create_release_archive
     else
         # 完整構建流程
         init_build_env
+        compile_artifacts
         build_all_libraries
         validate_infrastructure_files
+        evict_compile_cache
         run_tests
         generate_documentation
         create_release_archive
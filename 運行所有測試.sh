@@ -19,6 +19,8 @@ PASSED_TESTS=0
 FAILED_TESTS=0
 TOTAL_TESTS=0
 LOG_FILE="test_results.log"
+ARTIFACT_DIR="build/artifacts"
+USE_POOL=false
 
 # 清空日誌文件
 > "$LOG_FILE"
@@ -30,6 +32,44 @@ if ! command -v wenyan &> /dev/null; then
     exit 1
 fi
 
+# 測試先一次性編譯進產物庫，再在常駐的Node工作進程中運行，免去每個測試啟動wenyan的開銷
+if command -v python3 &> /dev/null && command -v node &> /dev/null; then
+    python3 wenyan_artifact_store.py --store "$ARTIFACT_DIR" compile "$TESTS_DIR" 測試*.wy > /dev/null 2>&1
+    coproc POOL { python3 wenyan_node_pool.py serve --store "$ARTIFACT_DIR" 2>/dev/null; }
+    USE_POOL=true
+fi
+
+# 函數：關閉工作進程池
+stop_pool() {
+    if [ -n "${POOL_PID:-}" ]; then
+        eval "exec ${POOL[1]}>&-"
+        wait "$POOL_PID" 2>/dev/null
+    fi
+}
+
+# 函數：將字符串轉為JSON字符串字面量（轉義反斜線、雙引號與控制字符）
+json_string() {
+    local text="$1"
+    text="${text//\\/\\\\}"
+    text="${text//\"/\\\"}"
+    text="${text//$'\n'/\\n}"
+    text="${text//$'\r'/\\r}"
+    text="${text//$'\t'/\\t}"
+    printf '"%s"' "$text"
+}
+
+# 函數：在工作進程池中運行測試，返回測試的退出代碼
+run_in_pool() {
+    local test_file="$1"
+    local output_file="$2"
+    local reply=""
+    
+    printf '{"path": %s, "output": %s, "error": %s}\n' "$(json_string "$test_file")" "$(json_string "$output_file")" "$(json_string "$output_file.err")" >&"${POOL[1]}" || return 127
+    read -r reply <&"${POOL[0]}" || return 127
+    [[ "$reply" =~ \"exitCode\":\ ([0-9]+) ]] || return 127
+    return "${BASH_REMATCH[1]}"
+}
+
 echo "開始運行測試..." | tee -a "$LOG_FILE"
 echo "Starting test execution..." | tee -a "$LOG_FILE"
 echo "" | tee -a "$LOG_FILE"
@@ -43,7 +83,19 @@ run_test_file() {
     echo "Running test: $test_file" | tee -a "$LOG_FILE"
     
     # 運行測試
-    if wenyan "$test_file" >> "$LOG_FILE" 2>&1; then
+    local test_result=0
+    if [ "$USE_POOL" = true ]; then
+        local output_file=$(mktemp)
+        run_in_pool "$test_file" "$output_file"
+        test_result=$?
+        cat "$output_file" "$output_file.err" >> "$LOG_FILE" 2>/dev/null
+        rm -f "$output_file" "$output_file.err"
+    else
+        wenyan "$test_file" >> "$LOG_FILE" 2>&1
+        test_result=$?
+    fi
+    
+    if [ $test_result -eq 0 ]; then
         echo "✓ 通過：$lib_name" | tee -a "$LOG_FILE"
         echo "✓ PASSED: $lib_name" | tee -a "$LOG_FILE"
         ((PASSED_TESTS++))
@@ -90,6 +142,8 @@ for test_file in *.wy; do
     fi
 done
 
+stop_pool
+
 # 生成最終報告
 echo "==========================================" | tee -a "$LOG_FILE"
 echo "測試結果摘要 - Test Results Summary" | tee -a "$LOG_FILE"